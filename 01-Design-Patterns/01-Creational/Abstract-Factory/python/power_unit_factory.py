@@ -1,16 +1,35 @@
 from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Union
+import asyncio
+import threading
+import weakref
 
 #region Abstract Classes
 class ICE(ABC):
+    bench_latency_s: float = 0.0  # Emulated round trip to the test-bench rig
+
     @abstractmethod
     def start(self):
         pass
 
+    async def start_async(self) -> str:
+        await asyncio.sleep(self.bench_latency_s)
+        return self.start()
+
 class ERS(ABC):
+    bench_latency_s: float = 0.0  # Emulated round trip to the test-bench rig
+
     @abstractmethod
     def recover_energy(self):
         pass
 
+    async def recover_energy_async(self) -> str:
+        await asyncio.sleep(self.bench_latency_s)
+        return self.recover_energy()
+
 class TeamFactory(ABC):
     @abstractmethod
     def create_ice(self) -> ICE:
@@ -19,6 +38,15 @@ class TeamFactory(ABC):
     @abstractmethod
     def create_ers(self) -> ERS:
         pass
+
+    def create_power_units(self, n: int) -> list[tuple[ICE, ERS]]:
+        # n matched ICE/ERS pairs in one call; the factory methods are looked up
+        # once instead of being dispatched again for every unit
+        create_ice, create_ers = self.create_ice, self.create_ers
+        units: list = [None] * n
+        for index in range(n):
+            units[index] = (create_ice(), create_ers())
+        return units
 #endregion
 
 #region Concrete Implementations
@@ -53,4 +81,163 @@ class MercedesFactory(TeamFactory):
     
     def create_ers(self) -> ERS:
         return MercedesERS()
-#endregion
\ No newline at end of file
+#endregion
+
+#region Team Registry
+_team_factory_classes: dict[str, type] = {
+    "Ferrari": FerrariFactory,
+    "Mercedes": MercedesFactory
+}
+_team_factories: dict[str, TeamFactory] = {}
+
+def register_team_factory(team: str, factory_cls: type) -> None:
+    _team_factory_classes[team] = factory_cls
+    _team_factories.pop(team, None)
+
+def get_team_factory(team: str) -> TeamFactory:
+    # Factories are stateless, so each team's factory is created once and cached
+    factory = _team_factories.get(team)
+    if factory is None:
+        factory_cls = _team_factory_classes.get(team)
+        if not factory_cls:
+            raise ValueError(f"Unknown team: {team}")
+        factory = _team_factories.setdefault(team, factory_cls())
+    return factory
+#endregion
+
+#region Async Grid Startup
+async def start_grid(factories: Iterable[TeamFactory], concurrency: int = 20,
+                     timeout: float = 5.0) -> list[Union[tuple[str, str], BaseException]]:
+    # Starts one power unit per factory (one factory per car) concurrently. At most
+    # `concurrency` cars talk to the rigs at once, and each car gets `timeout` seconds.
+    # Results keep grid order; a car that failed or timed out holds its exception.
+    limit = asyncio.Semaphore(concurrency)
+
+    async def start_car(factory: TeamFactory) -> tuple[str, str]:
+        ice, ers = factory.create_ice(), factory.create_ers()
+        async with limit:
+            started, recovering = await asyncio.wait_for(
+                asyncio.gather(ice.start_async(), ers.recover_energy_async()), timeout)
+        return started, recovering
+
+    return await asyncio.gather(*(start_car(factory) for factory in factories), return_exceptions=True)
+#endregion
+
+#region Pooled Factory
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    discarded: int = 0  # Releases dropped because the pool was already full
+    in_use: int = 0
+    high_water_mark: int = 0  # Most products checked out at the same time
+
+class PooledTeamFactory(TeamFactory):
+    # Recycles the ICE/ERS products of one team instead of creating fresh ones.
+    # acquire_*() checks a product out of a bounded, lock-protected pool and
+    # release_*() hands it back. create_*() stay available and acquire too.
+    # Only products this pool handed out, and still has checked out, can be
+    # released; anything else raises ValueError. Checked-out products are held
+    # by weak reference, so one that is dropped instead of released stops
+    # counting as in use once it is garbage collected.
+    def __init__(self, factory: TeamFactory, max_size: int = 64):
+        self.factory = factory
+        self.max_size = max_size
+        self._stats = PoolStats()
+        self._free = {"ice": [], "ers": []}
+        self._checked_out: dict[str, dict[int, weakref.KeyedRef]] = {"ice": {}, "ers": {}}
+        # Weakref callbacks only append here; they can fire during any allocation,
+        # so they must never take the lock themselves
+        self._dropped: deque = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> PoolStats:
+        with self._lock:
+            self._drain()
+            return self._stats
+
+    def _drain(self) -> None:
+        # Forgets checked-out products that were garbage collected (lock held)
+        dropped = self._dropped
+        while dropped:
+            ref = dropped.popleft()
+            kind, key = ref.key
+            checked_out = self._checked_out[kind]
+            if checked_out.get(key) is ref:
+                del checked_out[key]
+                self._stats.in_use -= 1
+
+    def _check_out(self, kind: str, product) -> None:
+        # Records a product as handed out (lock held)
+        self._drain()
+        self._checked_out[kind][id(product)] = weakref.KeyedRef(
+            product, self._dropped.append, (kind, id(product)))
+        stats = self._stats
+        stats.in_use += 1
+        if stats.in_use > stats.high_water_mark:
+            stats.high_water_mark = stats.in_use
+
+    def _acquire(self, kind: str, create):
+        with self._lock:
+            free = self._free[kind]
+            if free:
+                product = free.pop()
+                self._stats.hits += 1
+                self._check_out(kind, product)
+                return product
+        # Counted only once create() succeeds, so a failing factory leaves no trace
+        product = create()
+        with self._lock:
+            self._stats.misses += 1
+            self._check_out(kind, product)
+        return product
+
+    def _release(self, kind: str, product) -> None:
+        with self._lock:
+            self._drain()
+            checked_out = self._checked_out[kind]
+            ref = checked_out.get(id(product))
+            if ref is None or ref() is not product:
+                raise ValueError(f"{product!r} is not checked out of this {kind.upper()} pool")
+            del checked_out[id(product)]
+            self._stats.in_use -= 1
+        # Nobody else can acquire the product until it is back on the free list
+        reset = getattr(product, "reset", None)
+        if reset is not None:
+            reset()
+        with self._lock:
+            free = self._free[kind]
+            if len(free) < self.max_size:
+                free.append(product)
+            else:
+                self._stats.discarded += 1
+
+    def acquire_ice(self) -> ICE:
+        return self._acquire("ice", self.factory.create_ice)
+
+    def acquire_ers(self) -> ERS:
+        return self._acquire("ers", self.factory.create_ers)
+
+    def release_ice(self, ice: ICE) -> None:
+        self._release("ice", ice)
+
+    def release_ers(self, ers: ERS) -> None:
+        self._release("ers", ers)
+
+    def create_ice(self) -> ICE:
+        return self.acquire_ice()
+
+    def create_ers(self) -> ERS:
+        return self.acquire_ers()
+
+    @contextmanager
+    def power_unit(self) -> Iterator[tuple[ICE, ERS]]:
+        # Checks out a matched ICE/ERS pair for the duration of the block
+        ice, ers = self.acquire_ice(), self.acquire_ers()
+        try:
+            yield ice, ers
+        finally:
+            self.release_ers(ers)
+            self.release_ice(ice)
+#endregion
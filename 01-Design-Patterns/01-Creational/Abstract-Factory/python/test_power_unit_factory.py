@@ -1,10 +1,16 @@
+import asyncio
+import gc
 import pytest
+import threading
 from abc import ABC
+import power_unit_factory
 from power_unit_factory import (
     TeamFactory, FerrariFactory, MercedesFactory,
     ICE, ERS,
     FerrariICE, FerrariERS,
-    MercedesICE, MercedesERS
+    MercedesICE, MercedesERS,
+    PooledTeamFactory, get_team_factory, register_team_factory,
+    start_grid
 )
 
 def test_interfaces_are_abstract():
@@ -86,4 +92,310 @@ def test_client_decoupling():
     # Test with Mercedes
     eng_sound, batt_status = assemble_f1_car(MercedesFactory())
     assert "Mercedes" in eng_sound
-    assert "kinetic" in batt_status
\ No newline at end of file
+    assert "kinetic" in batt_status
+
+def test_pooled_factory_recycles_products():
+    """
+    TEST 4: Object Pooling
+    Released products are handed out again, and the pool keeps producing the
+    team's own family.
+    """
+    pool = PooledTeamFactory(FerrariFactory(), max_size=2)
+    assert isinstance(pool, TeamFactory)
+
+    ice = pool.acquire_ice()
+    assert isinstance(ice, FerrariICE)
+    pool.release_ice(ice)
+    assert pool.acquire_ice() is ice
+
+    with pool.power_unit() as (engine, battery):
+        assert isinstance(engine, FerrariICE)
+        assert isinstance(battery, FerrariERS)
+    assert pool.acquire_ers() is battery
+
+    assert pool.stats.hits == 2
+    assert pool.stats.misses == 3
+    assert pool.stats.in_use == 2
+    assert pool.stats.high_water_mark == 3
+
+def test_pool_is_bounded():
+    """
+    TEST 5: Bounded Pools
+    Releases beyond max_size are dropped instead of growing the pool.
+    """
+    pool = PooledTeamFactory(MercedesFactory(), max_size=2)
+    units = [pool.create_ice() for _ in range(5)]
+    for ice in units:
+        pool.release_ice(ice)
+
+    assert len(pool._free["ice"]) == 2
+    assert pool.stats.discarded == 3
+    assert pool.stats.high_water_mark == 5
+    assert pool.stats.in_use == 0
+
+def test_pool_thread_safe_checkout():
+    """
+    TEST 6: Thread-Safe Checkout
+    Concurrent acquire/release from many threads never hands one product
+    to two holders at once.
+    """
+    pool = PooledTeamFactory(FerrariFactory(), max_size=8)
+    holders = {}
+    clashes = []
+    holders_lock = threading.Lock()
+
+    def race_weekend():
+        for _ in range(500):
+            ice = pool.acquire_ice()
+            with holders_lock:
+                if id(ice) in holders:
+                    clashes.append(ice)
+                holders[id(ice)] = ice
+            with holders_lock:
+                del holders[id(ice)]
+            pool.release_ice(ice)
+
+    threads = [threading.Thread(target=race_weekend) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not clashes
+    assert pool.stats.in_use == 0
+    assert pool.stats.hits + pool.stats.misses == 4_000
+
+def test_pooling_reduces_garbage_collections():
+    """
+    TEST 7: Verification of Pooling Under GC (20 cars x 70 laps)
+    Over 20 iterations of a race weekend, the pool creates only one grid's worth
+    of products, serves every later lap from the free list, and triggers no more
+    garbage collections than creating fresh products every lap.
+    """
+    collections = []
+    def on_gc(phase, info):
+        if phase == "start":
+            collections.append(info["generation"])
+
+    def simulate(factory, release):
+        for _ in range(20):  # Iterations
+            for _ in range(70):  # Laps
+                units = [(factory.create_ice(), factory.create_ers()) for _ in range(20)]
+                for ice, ers in units:
+                    ice.start()
+                    ers.recover_energy()
+                    release(factory, ice, ers)
+
+    pool = PooledTeamFactory(FerrariFactory(), max_size=20)
+    runs = {
+        "fresh": lambda: simulate(FerrariFactory(), lambda factory, ice, ers: None),
+        "pooled": lambda: simulate(pool, lambda factory, ice, ers: (factory.release_ice(ice), factory.release_ers(ers))),
+    }
+    results = {}
+    gc.callbacks.append(on_gc)
+    try:
+        for label, run in runs.items():
+            gc.collect()
+            collections.clear()
+            run()
+            results[label] = len(collections)
+    finally:
+        gc.callbacks.remove(on_gc)
+
+    assert results["pooled"] <= results["fresh"]
+    assert pool.stats.misses == 40
+    assert pool.stats.hits == 20 * 70 * 40 - 40
+    assert pool.stats.high_water_mark == 40
+
+def test_create_power_units_returns_matched_pairs():
+    """
+    TEST 8: Bulk Power-Unit Assembly
+    create_power_units(n) returns n distinct, matched ICE/ERS pairs.
+    """
+    units = MercedesFactory().create_power_units(20)
+
+    assert len(units) == 20
+    assert all(isinstance(ice, MercedesICE) and isinstance(ers, MercedesERS) for ice, ers in units)
+    assert len({id(ice) for ice, _ in units}) == 20
+    assert FerrariFactory().create_power_units(0) == []
+
+    pool = PooledTeamFactory(FerrariFactory())
+    pooled_units = pool.create_power_units(3)
+    assert all(isinstance(ice, FerrariICE) for ice, _ in pooled_units)
+    assert pool.stats.in_use == 6
+
+def test_team_factory_registry():
+    """
+    TEST 9: Team Factory Registry
+    get_team_factory returns one cached factory per team and rejects unknown teams.
+    """
+    assert isinstance(get_team_factory("Ferrari"), FerrariFactory)
+    assert get_team_factory("Ferrari") is get_team_factory("Ferrari")
+    assert isinstance(get_team_factory("Mercedes"), MercedesFactory)
+
+    with pytest.raises(ValueError) as excinfo:
+        get_team_factory("Minardi")
+    assert "Unknown team" in str(excinfo.value)
+
+    class CustomerFerrariFactory(FerrariFactory):
+        pass
+
+    try:
+        register_team_factory("Haas", CustomerFerrariFactory)
+        assert isinstance(get_team_factory("Haas"), CustomerFerrariFactory)
+    finally:
+        power_unit_factory._team_factory_classes.pop("Haas", None)
+        power_unit_factory._team_factories.pop("Haas", None)
+    with pytest.raises(ValueError):
+        get_team_factory("Haas")
+
+def test_bulk_assembly():
+    """
+    TEST 10: Verification of Bulk Assembly
+    create_power_units(20) returns the same 20-car grid as back-to-back
+    create_*() calls: matched pairs of distinct, freshly created products.
+    """
+    factory = get_team_factory("Ferrari")
+    per_call = [(factory.create_ice(), factory.create_ers()) for _ in range(20)]
+    bulk = factory.create_power_units(20)
+
+    assert len(bulk) == len(per_call) == 20
+    assert [(type(ice), type(ers)) for ice, ers in bulk] == [(type(ice), type(ers)) for ice, ers in per_call]
+    assert all(isinstance(ice, FerrariICE) and isinstance(ers, FerrariERS) for ice, ers in bulk)
+    assert len({id(product) for unit in bulk for product in unit}) == 40
+    assert factory.create_power_units(0) == []
+
+class BenchRig:
+    """Emulated test-bench rig that counts how many units talk to it at once."""
+    def __init__(self):
+        self.connected = 0
+        self.peak = 0
+
+    async def round_trip(self, latency_s):
+        self.connected += 1
+        self.peak = max(self.peak, self.connected)
+        try:
+            await asyncio.sleep(latency_s)
+        finally:
+            self.connected -= 1
+
+class BenchRigICE(FerrariICE):
+    async def start_async(self) -> str:
+        await self.rig.round_trip(self.bench_latency_s)
+        return self.start()
+
+class BenchRigERS(FerrariERS):
+    async def recover_energy_async(self) -> str:
+        await self.rig.round_trip(self.bench_latency_s)
+        return self.recover_energy()
+
+class BenchRigFactory(FerrariFactory):
+    """Ferrari factory whose products answer from an emulated test-bench rig."""
+    def __init__(self, latency_s, rig=None):
+        self.latency_s = latency_s
+        self.rig = rig or BenchRig()
+
+    def create_ice(self) -> ICE:
+        ice = BenchRigICE()
+        ice.bench_latency_s, ice.rig = self.latency_s, self.rig
+        return ice
+
+    def create_ers(self) -> ERS:
+        ers = BenchRigERS()
+        ers.bench_latency_s, ers.rig = self.latency_s, self.rig
+        return ers
+
+def test_async_products():
+    """
+    TEST 11: Async Product Variants
+    Every product offers an awaitable variant with the same result.
+    """
+    async def bring_up(factory):
+        return await factory.create_ice().start_async(), await factory.create_ers().recover_energy_async()
+
+    assert asyncio.run(bring_up(FerrariFactory())) == (FerrariICE().start(), FerrariERS().recover_energy())
+    assert asyncio.run(bring_up(MercedesFactory())) == (MercedesICE().start(), MercedesERS().recover_energy())
+
+def test_start_grid_runs_concurrently():
+    """
+    TEST 12: Concurrent Grid Startup
+    All 20 cars of a grid talk to the rigs at the same time instead of one
+    after another, and results keep grid order.
+    """
+    rig = BenchRig()
+    grid = [BenchRigFactory(0.01, rig) for _ in range(20)]
+
+    results = asyncio.run(start_grid(grid))
+
+    assert results == [("Ferrari ICE roaring to life!", "Ferrari ERS recovering heat energy!")] * 20
+    assert rig.peak == 20 * 2
+    assert rig.connected == 0
+
+def test_start_grid_limits_and_timeouts():
+    """
+    TEST 13: Concurrency Limit & Timeouts
+    The concurrency limit batches the cars, and a unit that misses its
+    timeout is reported without failing the rest of the grid.
+    """
+    rig = BenchRig()
+    asyncio.run(start_grid([BenchRigFactory(0.01, rig) for _ in range(8)], concurrency=2))
+    assert rig.peak == 2 * 2
+
+    results = asyncio.run(start_grid([BenchRigFactory(0.0), BenchRigFactory(1.0), MercedesFactory()], timeout=0.05))
+    assert results[0][0] == "Ferrari ICE roaring to life!"
+    assert isinstance(results[1], asyncio.TimeoutError)
+    assert results[2][1] == "Mercedes ERS recovering kinetic energy!"
+
+def test_pool_rejects_invalid_releases():
+    """
+    TEST 14: Checkout Integrity
+    Releasing a product twice, or one the pool never handed out, raises instead
+    of letting two callers hold the same product.
+    """
+    pool = PooledTeamFactory(FerrariFactory())
+    ice = pool.acquire_ice()
+    pool.release_ice(ice)
+
+    with pytest.raises(ValueError):
+        pool.release_ice(ice)
+    with pytest.raises(ValueError):
+        pool.release_ice(FerrariFactory().create_ice())
+    with pytest.raises(ValueError):
+        pool.release_ers(pool.acquire_ice())
+
+    first, second = pool.acquire_ice(), pool.acquire_ice()
+    assert first is not second
+    assert pool.stats.in_use == 3
+
+def test_pool_forgets_dropped_products():
+    """
+    TEST 15: Dropped & Failed Checkouts
+    Products that are dropped instead of released stop counting as in use, a
+    recycled id never lets a foreign product be released, and a failing
+    create() leaves the counters untouched.
+    """
+    pool = PooledTeamFactory(FerrariFactory())
+    units = pool.create_power_units(1_000)
+    assert pool.stats.in_use == 2_000
+    del units
+    gc.collect()
+    assert pool.stats.in_use == 0
+    assert pool.stats.high_water_mark == 2_000
+
+    for _ in range(100):
+        pool.acquire_ice()
+        with pytest.raises(ValueError):
+            pool.release_ice(FerrariICE())
+    gc.collect()
+    assert pool.stats.in_use == 0
+
+    class BrokenFactory(FerrariFactory):
+        def create_ice(self) -> ICE:
+            raise RuntimeError("rig offline")
+
+    broken = PooledTeamFactory(BrokenFactory())
+    with pytest.raises(RuntimeError):
+        broken.acquire_ice()
+    assert broken.stats.in_use == 0
+    assert broken.stats.misses == 0
+    assert broken.stats.high_water_mark == 0
@@ -0,0 +1,397 @@
+import argparse
+import asyncio
+import copy
+import importlib
+import json
+import multiprocessing
+import pickle
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import timeit
+from functools import partial
+from multiprocessing.managers import BaseManager
+from pathlib import Path
+from typing import Callable, Optional
+
+# Pattern modules are loaded through the same helper the instrumentation uses
+_INSTRUMENTATION_DIR = str(Path(__file__).resolve().parents[2] / "Instrumentation" / "python")
+if _INSTRUMENTATION_DIR not in sys.path:
+    sys.path.append(_INSTRUMENTATION_DIR)
+from instrumentation import import_pattern_module
+
+def _time_ns(operation: Callable[[], object], number: int, repeat: int) -> float:
+    # Best-of-`repeat` nanoseconds per call, the least noisy estimate timeit offers
+    return min(timeit.repeat(operation, number=number, repeat=repeat)) / number * 1e9
+
+def _contended_update_ns(race_control, readers: int, number: int, repeat: int) -> float:
+    # update_status while `readers` threads poll get_status() as fast as they can
+    rc = race_control.RaceControl.get_instance()
+    stop = threading.Event()
+
+    def poll():
+        while not stop.is_set():
+            rc.get_status()
+
+    threads = [threading.Thread(target=poll) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    flags = iter(("YELLOW", "GREEN") * (number * repeat))
+    try:
+        return _time_ns(lambda: rc.update_status(next(flags)), number, repeat)
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+        rc.update_status("GREEN")
+
+def run_benchmarks(quick: bool = False) -> dict[str, float]:
+    # Nanoseconds per operation for every creational hot path
+    engine_factory = import_pattern_module("Factory", "engine_factory")
+    power_unit_factory = import_pattern_module("Abstract-Factory", "power_unit_factory")
+    f1_car_builder = import_pattern_module("Builder", "f1_car_builder")
+    car_setup = import_pattern_module("Prototype", "car_setup")
+    race_control = import_pattern_module("Singleton", "race_control")
+
+    number, repeat = (200, 2) if quick else (20_000, 5)
+    results = {}
+
+    factory, pooled = engine_factory.EngineFactory(), engine_factory.EngineFactory(pooled=True)
+    results["EngineFactory.get_engine"] = _time_ns(lambda: factory.get_engine("Ferrari"), number, repeat)
+    results["EngineFactory.get_engine[pooled]"] = _time_ns(lambda: pooled.get_engine("Ferrari"), number, repeat)
+
+    team = power_unit_factory.FerrariFactory()
+    results["TeamFactory.create_ice+create_ers"] = _time_ns(lambda: (team.create_ice(), team.create_ers()), number, repeat)
+
+    engineer, builder = f1_car_builder.RaceEngineer(), f1_car_builder.MonacoBuilder()
+    def build():
+        engineer.construct_car(builder)
+        return builder.get_result()
+    results["RaceEngineer.construct_car+get_result"] = _time_ns(build, number, repeat)
+
+    for points in (10, 1_000, 20_000):
+        engine = car_setup.EngineConfiguration("Race", list(range(points)))
+        setup = car_setup.CarSetup(4, 21.0, engine)
+        clones = max(number * 10 // points, 10) if points > 100 else number
+        results[f"CarSetup.clone[{points}]"] = _time_ns(setup.clone, clones, repeat)
+
+    results["RaceControl.update_status[4 readers]"] = _contended_update_ns(race_control, 4, number // 10 or 1, repeat)
+    return results
+
+# Speed targets of the pattern modules. Each one is reported as a speedup: the
+# reference time (a slower alternative, or a fixed budget) over the candidate
+# time, and it is met when the speedup reaches the required factor.
+_PLUGIN_SOURCE = '''
+from engine_factory import Engine, EngineSpec
+
+class {name}Engine(Engine):
+    spec = EngineSpec("{name}", 1.6, "V", 6, {hp})
+
+    def start(self) -> str:
+        return "{name} engine started."
+
+    def stop(self) -> str:
+        return "{name} engine stopped."
+
+    def get_spec(self) -> str:
+        return self.spec.label
+'''
+
+def _elapsed_s(operation: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    operation()
+    return time.perf_counter() - start
+
+def _pooled_engine_speedup(quick: bool) -> float:
+    # ns per get_engine() call of a pooled factory (flyweight hits) vs a plain one
+    engine_factory = import_pattern_module("Factory", "engine_factory")
+    fresh, pooled = engine_factory.EngineFactory(), engine_factory.EngineFactory(pooled=True)
+    number, repeat = (2_000, 3) if quick else (200_000, 5)
+    return (_time_ns(partial(fresh.get_engine, "Ferrari"), number, repeat)
+            / _time_ns(partial(pooled.get_engine, "Ferrari"), number, repeat))
+
+def _lazy_registry_speedup(quick: bool) -> float:
+    # Declaring plugin manufacturers by dotted path vs importing them all up front
+    engine_factory = import_pattern_module("Factory", "engine_factory")
+    names = [f"Target{index}" for index in range(50 if quick else 500)]
+    modules = [f"{name.lower()}_engine" for name in names]
+    with tempfile.TemporaryDirectory() as directory:
+        for index, name in enumerate(names):
+            Path(directory, f"{name.lower()}_engine.py").write_text(_PLUGIN_SOURCE.format(name=name, hp=600 + index))
+        sys.path.insert(0, directory)
+        importlib.invalidate_caches()
+        try:
+            lazy = type("LazyCatalogue", (engine_factory.EngineFactory,), {})
+            eager = type("EagerCatalogue", (engine_factory.EngineFactory,), {})
+            lazy_s = _elapsed_s(lambda: [lazy.register(name, f"{module}:{name}Engine")
+                                         for name, module in zip(names, modules)])
+            eager_s = _elapsed_s(lambda: [eager.register(name, getattr(importlib.import_module(module), f"{name}Engine"))
+                                          for name, module in zip(names, modules)])
+        finally:
+            sys.path.remove(directory)
+            for module in modules:
+                sys.modules.pop(module, None)
+    return eager_s / lazy_s
+
+def _copy_on_write_speedup(quick: bool) -> float:
+    # Copy-on-write clones vs deep copies of a 20k-point torque map, per clone
+    car_setup = import_pattern_module("Prototype", "car_setup")
+    setup = car_setup.CarSetup(4, 21.0, car_setup.EngineConfiguration("Race", list(range(20_000))))
+    deep, shared = (5, 500) if quick else (50, 5_000)
+    deep_s = _elapsed_s(lambda: [setup.clone() for _ in range(deep)]) / deep
+    shared_s = _elapsed_s(lambda: [setup.clone(copy_on_write=True) for _ in range(shared)]) / shared
+    return deep_s / shared_s
+
+def _clone_many_speedup(quick: bool) -> float:
+    # clone_many() vs a loop of clone() plus attribute writes, 10k candidates
+    car_setup = import_pattern_module("Prototype", "car_setup")
+    maps = [[base + rpm for rpm in range(200)] for base in range(0, 500, 100)]
+    prototype = car_setup.CarSetup(4, 21.0, car_setup.EngineConfiguration("Race", maps[0]))
+    wings, pressures = range(5 if quick else 50), [19.0 + 0.1 * step for step in range(40)]
+
+    def loop():
+        population = []
+        for wing in wings:
+            for pressure in pressures:
+                for torque_map in maps:
+                    setup = prototype.clone(copy_on_write=True)
+                    setup.front_wing_angle = wing
+                    setup.tyre_pressure_psi = pressure
+                    setup.engine.torque_map = torque_map
+                    population.append(setup)
+        return population
+
+    return _elapsed_s(loop) / _elapsed_s(lambda: prototype.clone_many(wings, pressures, maps))
+
+def _quali_maps(car_setup, count: int, points: int, rng: random.Random) -> list:
+    return [car_setup.EngineConfiguration("Race", [rng.randrange(300, 900) for _ in range(points)])
+            for _ in range(count)]
+
+def _shared_transform_speedup(quick: bool) -> float:
+    # Quali maps (x1.05, capped per RPM band) for 10k copy-on-write clones of one
+    # 20k-point map, against a budget of one second
+    car_setup = import_pattern_module("Prototype", "car_setup")
+    points, clones = 20_000, 1_000 if quick else 10_000
+    quali = car_setup.TorqueTransform().scale(1.05).clamp(high=[880] * points)
+    engine = _quali_maps(car_setup, 1, points, random.Random(7))[0]
+    prototype = car_setup.CarSetup(4, 21.0, engine)
+    engines = [prototype.clone(copy_on_write=True).engine for _ in range(clones)]
+    return 1.0 / _elapsed_s(lambda: quali.apply_many(engines))
+
+def _fused_transform_speedup(quick: bool) -> float:
+    # The same transform on distinct 20k-point maps vs a per-map list comprehension
+    car_setup = import_pattern_module("Prototype", "car_setup")
+    points, count, rng = 20_000, 2 if quick else 20, random.Random(7)
+    caps = [880] * points
+    quali = car_setup.TorqueTransform().scale(1.05).clamp(high=caps)
+    fused_s = _elapsed_s(partial(quali.apply_many, _quali_maps(car_setup, count, points, rng)))
+    engines = _quali_maps(car_setup, count, points, rng)
+
+    def comprehension():
+        for engine in engines:
+            engine.torque_map = [min(int(torque * 1.05 + 0.5), cap) for torque, cap in zip(engine.torque_map, caps)]
+
+    return _elapsed_s(comprehension) / fused_s
+
+def _registry_clone_speedup(quick: bool) -> float:
+    # SetupRegistry.get_clone() vs copy.deepcopy of the same 100-point setup;
+    # median of interleaved pairs, so both sides see the same background noise
+    car_setup = import_pattern_module("Prototype", "car_setup")
+    setup_registry = import_pattern_module("Prototype", "setup_registry")
+    setup = car_setup.CarSetup(12, 21.5, car_setup.EngineConfiguration("Race", list(range(100))))
+    registry = setup_registry.SetupRegistry()
+    key = registry.register("Monza", "Race", setup)
+    rounds, pairs = (100, 5) if quick else (1_000, 25)
+    return statistics.median(timeit.timeit(partial(copy.deepcopy, setup), number=rounds)
+                             / timeit.timeit(partial(registry.get_clone, key), number=rounds)
+                             for _ in range(pairs))
+
+def _library_open_speedup(quick: bool) -> float:
+    # Opening a memory-mapped setup library and reading one setup vs unpickling it
+    car_setup = import_pattern_module("Prototype", "car_setup")
+    setup_library = import_pattern_module("Prototype", "setup_library")
+    count, modes = 500 if quick else 5_000, ("Race", "Qualifying", "Save")
+    setups = [car_setup.CarSetup(index % 30, 19.0 + (index % 40) * 0.1, car_setup.EngineConfiguration(
+                  modes[index % 3], [index + rpm for rpm in range(200 + index % 3)]))
+              for index in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        library_path, pickle_path = Path(directory, "setups.f1lib"), Path(directory, "setups.pickle")
+        setup_library.save_setups(setups, library_path)
+        pickle_path.write_bytes(pickle.dumps(setups))
+        pickle_s = _elapsed_s(lambda: pickle.loads(pickle_path.read_bytes()))
+        start = time.perf_counter()
+        library = setup_library.SetupLibrary(library_path)
+        library[count - 1]
+        open_s = time.perf_counter() - start
+        library.close()
+    return pickle_s / open_s
+
+def _nearest_query_speedup(quick: bool) -> float:
+    # k=5 queries over a 1M-setup index, filled in sorted grid order, against a
+    # budget of one millisecond per query
+    car_setup = import_pattern_module("Prototype", "car_setup")
+    setup_index = import_pattern_module("Prototype", "setup_index")
+    rng, steps = random.Random(11), 400 if quick else 20_000
+    engine = car_setup.EngineConfiguration("Race", [0])
+    index = setup_index.SetupIndex()
+    index.extend(car_setup.CarSetup(wing, 18.0 + step * 8.0 / steps, engine)
+                 for wing in range(50) for step in range(steps))
+    queries = [(rng.uniform(0, 40), rng.uniform(18.0, 26.0)) for _ in range(100 if quick else 1_000)]
+    per_query_s = _elapsed_s(lambda: [index.nearest(wing, pressure, "Race", k=5)
+                                      for wing, pressure in queries]) / len(queries)
+    return 0.001 / per_query_s
+
+def _get_instance_speedup(quick: bool) -> float:
+    # RaceControl.get_instance() vs a plain dict lookup, once the instance exists
+    race_control = import_pattern_module("Singleton", "race_control")
+    RaceControl = race_control.RaceControl
+    instances = {RaceControl: RaceControl.get_instance()}
+    number, repeat = (2_000, 3) if quick else (200_000, 5)
+    dict_ns = _time_ns(partial(instances.get, RaceControl), number, repeat)
+    return dict_ns / _time_ns(RaceControl.get_instance, number, repeat)
+
+def _fan_out_speedup(quick: bool) -> float:
+    # update_status() until the last of 1k subscribers has seen the flag, best
+    # of 10, against a budget of 50 ms
+    race_control = import_pattern_module("Singleton", "race_control")
+    rc = race_control.RaceControl.get_instance()
+    rc.update_status("GREEN")
+    seen_at = [0] * (100 if quick else 1_000)
+    unsubscribers = [rc.subscribe(lambda status, slot=slot: seen_at.__setitem__(slot, time.perf_counter()))
+                     for slot in range(len(seen_at))]
+    latencies = []
+    try:
+        for flag in ("SAFETY_CAR", "GREEN") * 5:
+            start = time.perf_counter()
+            rc.update_status(flag)
+            latencies.append(max(seen_at) - start)
+    finally:
+        for unsubscribe in unsubscribers:
+            unsubscribe()
+    return 0.05 / min(latencies)
+
+def _time_status_reads(control, reads: int, results) -> None:
+    start = time.perf_counter_ns()
+    for _ in range(reads):
+        control.get_status()
+    results.put((time.perf_counter_ns() - start) / reads)
+
+class _RaceControlManager(BaseManager):
+    pass
+
+def _shared_memory_speedup(quick: bool) -> float:
+    # Cross-process get_status() on the shared segment vs a Manager proxy of RaceControl
+    race_control = import_pattern_module("Singleton", "race_control")
+    shared_race_control = import_pattern_module("Singleton", "shared_race_control")
+    _RaceControlManager.register("RaceControl", race_control.RaceControl)
+    results = multiprocessing.Queue()
+
+    def time_reads(control, reads: int) -> float:
+        reader = multiprocessing.Process(target=_time_status_reads, args=(control, reads, results))
+        reader.start()
+        ns = results.get(timeout=60)
+        reader.join()
+        return ns
+
+    with shared_race_control.SharedRaceControl.create() as control:
+        shared_ns = time_reads(control, 10_000 if quick else 100_000)
+    with _RaceControlManager() as manager:
+        proxy_ns = time_reads(manager.RaceControl(), 200 if quick else 2_000)
+    return proxy_ns / shared_ns
+
+def _start_grid_speedup(quick: bool) -> float:
+    # Starting a 20-car grid whose rigs answer after 50 ms, against a budget of
+    # half the time a one-car-at-a-time startup would take
+    power_unit_factory = import_pattern_module("Abstract-Factory", "power_unit_factory")
+    latency_s = 0.01 if quick else 0.05
+
+    class SlowRigFactory(power_unit_factory.FerrariFactory):
+        def create_ice(self):
+            ice = super().create_ice()
+            ice.bench_latency_s = latency_s
+            return ice
+
+        def create_ers(self):
+            ers = super().create_ers()
+            ers.bench_latency_s = latency_s
+            return ers
+
+    grid = [SlowRigFactory() for _ in range(20)]
+    return latency_s * len(grid) / 2 / _elapsed_s(lambda: asyncio.run(power_unit_factory.start_grid(grid)))
+
+# (name, required speedup, measurement)
+TARGETS: list[tuple[str, float, Callable[[bool], float]]] = [
+    ("EngineFactory.get_engine pooled vs fresh", 1.0, _pooled_engine_speedup),
+    ("EngineFactory lazy vs eager registration [500]", 1.0, _lazy_registry_speedup),
+    ("CarSetup.clone copy-on-write vs deep [20000]", 1.0, _copy_on_write_speedup),
+    ("CarSetup.clone_many vs clone loop [10000]", 1.0, _clone_many_speedup),
+    ("TorqueTransform 10k shared maps vs 1 s", 1.0, _shared_transform_speedup),
+    ("TorqueTransform fused vs comprehension", 1.0, _fused_transform_speedup),
+    ("SetupRegistry.get_clone vs deepcopy", 10.0, _registry_clone_speedup),
+    ("SetupLibrary open vs pickle.load [5000]", 1.0, _library_open_speedup),
+    ("SetupIndex.nearest(k=5) [1M] vs 1 ms", 1.0, _nearest_query_speedup),
+    ("RaceControl.get_instance vs dict lookup", 0.2, _get_instance_speedup),
+    ("RaceControl fan-out [1k subscribers] vs 50 ms", 1.0, _fan_out_speedup),
+    ("SharedRaceControl vs Manager proxy", 10.0, _shared_memory_speedup),
+    ("start_grid [20 cars] vs half of serial", 1.0, _start_grid_speedup),
+]
+
+def run_targets(quick: bool = False) -> dict[str, tuple[float, float]]:
+    # (measured speedup, required speedup) for every target. Quick runs shrink the
+    # workloads, so their speedups only show that the measurements work.
+    return {name: (measure(quick), required) for name, required, measure in TARGETS}
+
+def compare(baseline: dict[str, float], current: dict[str, float], threshold: float) -> list[str]:
+    # Names of benchmarks that got slower than the baseline by more than `threshold` (0.2 = 20%)
+    return [name for name, base_ns in baseline.items()
+            if name in current and current[name] > base_ns * (1 + threshold)]
+
+def _report(baseline: Optional[dict[str, float]], current: dict[str, float]) -> None:
+    for name, ns in current.items():
+        line = f"{name:<42} {ns:12,.1f} ns/op"
+        if baseline and name in baseline:
+            line += f"   {(ns / baseline[name] - 1) * 100:+7.1f}% vs baseline"
+        print(line)
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks for the creational pattern hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the suite and optionally save a JSON baseline")
+    run.add_argument("--output", help="where to write the JSON results")
+    check = commands.add_parser("compare", help="run the suite and fail on regressions against a baseline")
+    check.add_argument("baseline", help="JSON file written by `run --output`")
+    check.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%% (default)")
+    targets = commands.add_parser("targets", help="measure the speed targets and fail if one is missed")
+    for command in (run, check, targets):
+        command.add_argument("--quick", action="store_true", help="few iterations, for smoke tests")
+    args = parser.parse_args(argv)
+
+    if args.command == "targets":
+        missed = 0
+        for name, (speedup, required) in run_targets(quick=args.quick).items():
+            met = speedup >= required
+            missed += not met
+            print(f"{name:<48} {speedup:10.2f}x   needs {required:g}x   {'ok' if met else 'MISSED'}")
+        return 1 if missed else 0
+
+    current = run_benchmarks(quick=args.quick)
+    if args.command == "run":
+        _report(None, current)
+        if args.output:
+            document = {"python": platform.python_version(), "machine": platform.machine(), "results": current}
+            Path(args.output).write_text(json.dumps(document, indent=2) + "\n")
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text())["results"]
+    _report(baseline, current)
+    regressions = compare(baseline, current, args.threshold)
+    for name in regressions:
+        print(f"REGRESSION: {name} is more than {args.threshold:.0%} slower than the baseline")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import json
+from benchmarks import TARGETS, compare, main, run_benchmarks, run_targets
+
+def test_suite_covers_every_hot_path():
+    """
+    TEST 1: Coverage
+    A quick run reports a positive ns/op for every creational hot path.
+    """
+    results = run_benchmarks(quick=True)
+
+    assert set(results) == {
+        "EngineFactory.get_engine",
+        "EngineFactory.get_engine[pooled]",
+        "TeamFactory.create_ice+create_ers",
+        "RaceEngineer.construct_car+get_result",
+        "CarSetup.clone[10]",
+        "CarSetup.clone[1000]",
+        "CarSetup.clone[20000]",
+        "RaceControl.update_status[4 readers]",
+    }
+    assert all(ns > 0 for ns in results.values())
+
+def test_compare_flags_regressions_only():
+    """
+    TEST 2: Regression Detection
+    Only benchmarks slower than the baseline by more than the threshold are flagged.
+    """
+    baseline = {"fast": 100.0, "steady": 100.0, "slow": 100.0, "retired": 100.0}
+    current = {"fast": 50.0, "steady": 119.0, "slow": 121.0, "new": 1_000.0}
+
+    assert compare(baseline, current, threshold=0.2) == ["slow"]
+    assert compare(baseline, current, threshold=0.25) == []
+
+def test_runner_baseline_round_trip(tmp_path, capsys):
+    """
+    TEST 3: Runner Entry Point
+    `run --output` writes a JSON baseline; `compare` passes against a generous
+    baseline and fails against an impossibly fast one.
+    """
+    baseline_path = tmp_path / "baseline.json"
+    assert main(["run", "--quick", "--output", str(baseline_path)]) == 0
+    document = json.loads(baseline_path.read_text())
+    assert "EngineFactory.get_engine" in document["results"]
+
+    generous = {name: ns * 1_000 for name, ns in document["results"].items()}
+    baseline_path.write_text(json.dumps({"results": generous}))
+    assert main(["compare", str(baseline_path), "--quick"]) == 0
+
+    impossible = {name: 1e-3 for name in document["results"]}
+    baseline_path.write_text(json.dumps({"results": impossible}))
+    assert main(["compare", str(baseline_path), "--quick", "--threshold", "0.5"]) == 1
+    assert "REGRESSION: EngineFactory.get_engine" in capsys.readouterr().out
+
+def test_speed_targets(capsys):
+    """
+    TEST 4: Speed Targets
+    A quick run measures every target, and `targets` reports each one and
+    exits 0 or 1 depending on whether all of them were met.
+    """
+    results = run_targets(quick=True)
+
+    assert list(results) == [name for name, _, _ in TARGETS]
+    assert all(speedup > 0 and required > 0 for speedup, required in results.values())
+
+    exit_code = main(["targets", "--quick"])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == len(TARGETS)
+    assert exit_code == (1 if any(line.endswith("MISSED") for line in lines) else 0)
@@ -1,8 +1,13 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, fields, replace
+from typing import Callable, ClassVar, Hashable, Iterable, Iterator, Optional, TextIO
+import csv
+import io
+import json
+import sys
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-@dataclass
+@dataclass(slots=True)
 class F1Car:
     chassis: Optional[str] = None
     engine: Optional[str] = None
@@ -10,20 +15,120 @@ class F1Car:
     rear_wing: Optional[str] = None
     tires: Optional[str] = None
 
-    def show_specs(self):
-        specs = (f"--- F1 Car Configuration ---\n"
-                 f"Chassis:    {self.chassis}\n"
-                 f"Engine:     {self.engine}\n"
-                 f"Front Wing: {self.front_wing}\n"
-                 f"Rear Wing:  {self.rear_wing}\n"
-                 f"Tires:      {self.tires}\n"
-                 f"---------------------------")
-        print(specs)
+    def format_specs(self) -> str:
+        return (f"--- F1 Car Configuration ---\n"
+                f"Chassis:    {self.chassis}\n"
+                f"Engine:     {self.engine}\n"
+                f"Front Wing: {self.front_wing}\n"
+                f"Rear Wing:  {self.rear_wing}\n"
+                f"Tires:      {self.tires}\n"
+                f"---------------------------")
+
+    def show_specs(self, sink: Optional[TextIO] = None):
+        # Prints to stdout unless another file-like sink is given
+        print(self.format_specs(), file=sink)
+
+    def freeze(self) -> "FrozenF1Car":
+        return FrozenF1Car(**{f.name: getattr(self, f.name) for f in fields(self)})
+
+@dataclass(frozen=True, slots=True)
+class FrozenF1Car:
+    # Immutable, slotted snapshot of a finished car. Component names are interned,
+    # so millions of cars built from the same builder share one copy of each string.
+    chassis: Optional[str] = None
+    engine: Optional[str] = None
+    front_wing: Optional[str] = None
+    rear_wing: Optional[str] = None
+    tires: Optional[str] = None
+
+    def __post_init__(self):
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if value is not None:
+                object.__setattr__(self, f.name, sys.intern(value))
+
+    format_specs = F1Car.format_specs
+    show_specs = F1Car.show_specs
+
+SPEC_FIELDS = ("chassis", "engine", "front_wing", "rear_wing", "tires")
+BUILD_STEPS = ("chassis", "engine", "wings", "tires")
+
+def render_specs(cars: Iterable, sink: TextIO, fmt: str = "text", buffer_size: int = 1 << 16) -> int:
+    # Streams the specs of every car into `sink` in one pass. Output is collected in a
+    # bounded in-memory buffer and written in large chunks instead of once per car.
+    # Formats: "text" (the show_specs block), "jsonl" or "csv". Returns the number of cars.
+    if fmt not in ("text", "jsonl", "csv"):
+        raise ValueError(f"Unknown spec format: {fmt}")
+    buffer = io.StringIO()
+    rows = csv.writer(buffer, lineterminator="\n") if fmt == "csv" else None
+    if rows:
+        rows.writerow(SPEC_FIELDS)
+    count = 0
+    for car in cars:
+        if fmt == "text":
+            buffer.write(car.format_specs())
+            buffer.write("\n")
+        elif fmt == "jsonl":
+            buffer.write(json.dumps({name: getattr(car, name) for name in SPEC_FIELDS}))
+            buffer.write("\n")
+        else:
+            rows.writerow([getattr(car, name) for name in SPEC_FIELDS])
+        count += 1
+        if buffer.tell() >= buffer_size:
+            sink.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+    sink.write(buffer.getvalue())
+    return count
 
 class CarBuilder(ABC):
+    deterministic: ClassVar[bool] = False  # Same car on every build, so the result may be memoized
+    # Incremental mode: get_result() keeps a copy of the car, and the next build starts
+    # from it and only re-runs the steps invalidated since then. Unchanged components
+    # are shared with the previous car instead of being built again.
+    incremental: bool = False
+    _previous: Optional[F1Car] = None
+    _dirty: frozenset = frozenset()
+
     def reset(self) -> None:
         self._car = F1Car()
-    
+
+    def set_incremental(self, enabled: bool = True) -> "CarBuilder":
+        self.incremental = enabled
+        self._previous = None
+        self._dirty = frozenset()
+        return self
+
+    def invalidate(self, *steps: str) -> None:
+        # Marks steps to re-run on the next incremental build; no steps means all of them
+        # A changed step also changes what a deterministic build of this class returns
+        unknown = set(steps) - set(BUILD_STEPS)
+        if unknown:
+            raise ValueError(f"Unknown build steps {sorted(unknown)}, expected some of {BUILD_STEPS}")
+        self._dirty = self._dirty | set(steps or BUILD_STEPS)
+        RaceEngineer.forget(type(self))
+
+    def memo_key(self) -> Optional[Hashable]:
+        # What a deterministic build depends on: the builder class and its public
+        # settings. None if a setting can't be hashed, so the build isn't memoized.
+        settings = tuple(sorted((name, value) for name, value in vars(self).items()
+                                if not name.startswith("_") and name != "incremental"))
+        try:
+            hash(settings)
+        except TypeError:
+            return None
+        return type(self), settings
+
+    def pending_steps(self) -> tuple[str, ...]:
+        # Steps the next construct_car() will run, in build order
+        if not self.incremental or self._previous is None:
+            return BUILD_STEPS
+        return tuple(step for step in BUILD_STEPS if step in self._dirty)
+
+    def resume(self) -> None:
+        # Starts the car from the previous product instead of an empty one
+        self._car = replace(self._previous) if self._previous is not None else F1Car()
+
     @abstractmethod
     def build_chassis(self) -> None:
         pass
@@ -41,10 +146,16 @@ class CarBuilder(ABC):
 
     def get_result(self) -> F1Car:
         product = self._car
+        if self.incremental:
+            # A copy, so callers that edit the returned car don't change the next build
+            self._previous = replace(product)
+            self._dirty = frozenset()
         self.reset()
         return product
 
 class MonacoBuilder(CarBuilder):
+    deterministic = True
+
     def __init__(self):
         self.reset()
 
@@ -59,6 +170,8 @@ class MonacoBuilder(CarBuilder):
         self._car.tires = "Soft Tires"
     
 class MonzaBuilder(CarBuilder):
+    deterministic = True
+
     def __init__(self):
         self.reset()
 
@@ -72,10 +185,53 @@ class MonzaBuilder(CarBuilder):
     def build_tires(self) -> None:
         self._car.tires = "Hard Tires"
 
+def _build_one(builder_factory: Callable[[], CarBuilder]) -> F1Car:
+    # Module level so it can be pickled into worker processes.
+    # Every job gets its own builder, because get_result() resets the builder's car.
+    builder = builder_factory()
+    RaceEngineer().construct_car(builder)
+    return builder.get_result()
+
 class RaceEngineer:
+    _frozen_cars: ClassVar[dict[Hashable, FrozenF1Car]] = {}
+
+    @classmethod
+    def forget(cls, builder_cls: type) -> None:
+        # Drops every memoized car of `builder_cls`
+        for key in [key for key in cls._frozen_cars if key[0] is builder_cls]:
+            cls._frozen_cars.pop(key, None)
+
     def construct_car(self, builder: CarBuilder) -> None:
-        builder.reset()
-        builder.build_chassis()
-        builder.build_engine()
-        builder.build_wings()
-        builder.build_tires()
\ No newline at end of file
+        steps = builder.pending_steps()
+        if steps == BUILD_STEPS:
+            builder.reset()
+        else:
+            builder.resume()
+        for step in steps:
+            getattr(builder, f"build_{step}")()
+
+    def construct_frozen_car(self, builder: CarBuilder) -> FrozenF1Car:
+        # Deterministic builders are only run once per builder class and settings;
+        # later calls return the cached immutable car until invalidate() is called
+        key = builder.memo_key() if builder.deterministic else None
+        if key is not None:
+            car = self._frozen_cars.get(key)
+            if car is not None:
+                return car
+        self.construct_car(builder)
+        car = builder.get_result().freeze()
+        if key is not None:
+            car = self._frozen_cars.setdefault(key, car)
+        return car
+
+    def construct_fleet(self, builder_specs: Iterable[Callable[[], CarBuilder]],
+                        workers: Optional[int] = None,
+                        use_processes: bool = False) -> Iterator[F1Car]:
+        # `builder_specs` are builder classes (or other picklable zero-argument callables).
+        # Cars are yielded in the order of the specs while later ones are still being built.
+        if not workers:
+            yield from map(_build_one, builder_specs)
+            return
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_cls(max_workers=workers) as executor:
+            yield from executor.map(_build_one, builder_specs, chunksize=16 if use_processes else 1)
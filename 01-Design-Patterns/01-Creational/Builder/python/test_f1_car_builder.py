@@ -1,9 +1,11 @@
+import io
 import pytest
 from abc import ABC
+from typing import Optional
 from f1_car_builder import (
-    F1Car, CarBuilder, 
+    F1Car, FrozenF1Car, CarBuilder,
     MonacoBuilder, MonzaBuilder, 
-    RaceEngineer
+    RaceEngineer, render_specs, SPEC_FIELDS
 )
 
 def test_builder_interface_is_abstract():
@@ -128,4 +130,306 @@ def test_inheritance_and_dry_reset():
     builder.reset()         
     
     car = builder.get_result()
-    assert car.chassis is None
\ No newline at end of file
+    assert car.chassis is None
+
+class WindTunnelMonzaBuilder(MonzaBuilder):
+    """Monza builder whose wing step does some CPU work, like loading aero tables."""
+    def build_wings(self) -> None:
+        sum(index * index for index in range(20_000))
+        super().build_wings()
+
+def test_construct_fleet_matches_serial_order():
+    """
+    TEST 8: Fleet Construction
+    construct_fleet must stream cars back in the order of the builder specs,
+    whether it runs serially, on threads or on processes.
+    """
+    engineer = RaceEngineer()
+    specs = [MonacoBuilder, MonzaBuilder] * 10
+
+    for options in ({}, {"workers": 4}, {"workers": 2, "use_processes": True}):
+        fleet = list(engineer.construct_fleet(specs, **options))
+        assert len(fleet) == 20
+        assert all(isinstance(car, F1Car) for car in fleet)
+        assert [car.chassis.split()[0] for car in fleet] == ["Monaco", "Monza"] * 10
+        assert len({id(car) for car in fleet}) == 20
+
+def test_construct_fleet_with_cpu_bound_builders():
+    """
+    TEST 9: Fleet Construction with CPU-Bound Builders
+    With builders that do real work per step, the serial, thread and process
+    paths all return the same cars in spec order.
+    """
+    import os
+
+    engineer = RaceEngineer()
+    specs = [WindTunnelMonzaBuilder, MonacoBuilder] * 50
+    workers = os.cpu_count() or 1
+
+    fleets = [[tuple(getattr(car, name) for name in SPEC_FIELDS) for car in engineer.construct_fleet(specs, **options)]
+              for options in ({}, {"workers": workers}, {"workers": workers, "use_processes": True})]
+    assert len(fleets[0]) == len(specs)
+    assert [row[0].split()[0] for row in fleets[0]] == ["Monza", "Monaco"] * 50
+    assert fleets[0] == fleets[1] == fleets[2]
+
+def test_slotted_and_frozen_cars():
+    """
+    TEST 10: Compact Representation
+    F1Car carries no per-instance __dict__, and its frozen variant is
+    immutable and shares interned component strings.
+    """
+    import dataclasses
+    import sys
+
+    car = F1Car(chassis="".join(["Test ", "Chassis"]), tires="Soft Tires")
+    assert not hasattr(car, "__dict__")
+
+    frozen = car.freeze()
+    assert isinstance(frozen, FrozenF1Car)
+    assert not hasattr(frozen, "__dict__")
+    assert frozen.chassis == "Test Chassis"
+    assert frozen.chassis is sys.intern("Test Chassis")
+    assert frozen.engine is None
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        frozen.tires = "Hard Tires"
+
+def test_memoized_frozen_builds():
+    """
+    TEST 11: Memoized Builds
+    Deterministic builders are run once; repeat builds return the cached car.
+    Builders without that guarantee always build a fresh car.
+    """
+    engineer = RaceEngineer()
+
+    monaco = engineer.construct_frozen_car(MonacoBuilder())
+    assert engineer.construct_frozen_car(MonacoBuilder()) is monaco
+    assert RaceEngineer().construct_frozen_car(MonacoBuilder()) is monaco
+    assert engineer.construct_frozen_car(MonzaBuilder()) is not monaco
+    assert "High Downforce" in monaco.front_wing
+
+    class SprintBuilder(MonzaBuilder):
+        deterministic = False
+
+    assert engineer.construct_frozen_car(SprintBuilder()) is not engineer.construct_frozen_car(SprintBuilder())
+
+def test_frozen_car_specs_output(capsys):
+    """
+    TEST 12: Frozen Product Specs
+    The frozen car prints the same spec block as F1Car.
+    """
+    RaceEngineer().construct_frozen_car(MonzaBuilder()).show_specs()
+    captured = capsys.readouterr()
+
+    assert "--- F1 Car Configuration ---" in captured.out
+    assert "Chassis:    Monza Carbon Monocoque" in captured.out
+
+class CountingSink(io.StringIO):
+    """Text sink that counts how many times it is written to."""
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+def test_show_specs_to_sink(capsys):
+    """
+    TEST 13: Non-Printing Spec Rendering
+    show_specs can write to any file-like sink instead of stdout.
+    """
+    car = F1Car(chassis="Test Chassis", tires="Test Tires")
+    sink = io.StringIO()
+
+    car.show_specs(sink)
+
+    assert capsys.readouterr().out == ""
+    assert sink.getvalue() == car.format_specs() + "\n"
+
+def test_render_specs_formats():
+    """
+    TEST 14: Bulk Rendering Formats
+    render_specs writes the human-readable block, JSON Lines or CSV.
+    """
+    import csv
+    import json
+
+    engineer = RaceEngineer()
+    cars = [engineer.construct_frozen_car(MonacoBuilder()), engineer.construct_frozen_car(MonzaBuilder())]
+
+    text = io.StringIO()
+    assert render_specs(cars, text) == 2
+    assert text.getvalue() == "".join(car.format_specs() + "\n" for car in cars)
+
+    lines = io.StringIO()
+    render_specs(cars, lines, fmt="jsonl")
+    records = [json.loads(line) for line in lines.getvalue().splitlines()]
+    assert records[1]["tires"] == "Hard Tires"
+    assert records[0]["chassis"] == "Monaco Carbon Monocoque"
+
+    table = io.StringIO()
+    render_specs(cars, table, fmt="csv")
+    rows = list(csv.DictReader(io.StringIO(table.getvalue())))
+    assert [row["front_wing"] for row in rows] == ["High Downforce Front Wing", "Low Drag Front Wing"]
+
+    with pytest.raises(ValueError):
+        render_specs(cars, io.StringIO(), fmt="xml")
+
+def test_render_specs_batches_writes():
+    """
+    TEST 15: Buffered Streaming
+    A large fleet is written in a handful of chunks, not one write per car,
+    and a generator input is consumed in a single pass.
+    """
+    car = RaceEngineer().construct_frozen_car(MonzaBuilder())
+    sink = CountingSink()
+
+    count = render_specs((car for _ in range(10_000)), sink, fmt="jsonl", buffer_size=1 << 16)
+
+    assert count == 10_000
+    assert len(sink.getvalue().splitlines()) == 10_000
+    assert sink.writes < 100
+
+class CadBuilder(CarBuilder):
+    # Every step builds a fresh component object and counts as expensive work
+    def __init__(self):
+        self.compound = "Soft"
+        self.calls = []
+        self.reset()
+
+    def build_chassis(self) -> None:
+        self.calls.append("chassis")
+        self._car.chassis = "".join(["CAD ", "Monocoque"])
+
+    def build_engine(self) -> None:
+        self.calls.append("engine")
+        self._car.engine = "".join(["V6 ", "Turbo"])
+
+    def build_wings(self) -> None:
+        self.calls.append("wings")
+        self._car.front_wing = "".join(["CAD ", "Front Wing"])
+        self._car.rear_wing = "".join(["CAD ", "Rear Wing"])
+
+    def build_tires(self) -> None:
+        self.calls.append("tires")
+        self._car.tires = f"{self.compound} Tires"
+
+def test_incremental_rebuild_runs_only_dirty_steps():
+    """
+    TEST 16: Incremental Rebuild
+    After a tyre change only build_tires() runs again; the new car is a separate
+    object that shares every unchanged component with the previous one.
+    """
+    builder = CadBuilder().set_incremental()
+    engineer = RaceEngineer()
+
+    engineer.construct_car(builder)
+    soft = builder.get_result()
+    assert builder.calls == ["chassis", "engine", "wings", "tires"]
+
+    builder.compound = "Hard"
+    builder.invalidate("tires")
+    assert builder.pending_steps() == ("tires",)
+    builder.calls.clear()
+    engineer.construct_car(builder)
+    hard = builder.get_result()
+
+    assert builder.calls == ["tires"]
+    assert hard is not soft
+    assert (soft.tires, hard.tires) == ("Soft Tires", "Hard Tires")
+    for name in ("chassis", "engine", "front_wing", "rear_wing"):
+        assert getattr(hard, name) is getattr(soft, name)
+
+    # Nothing dirty: an identical car without running any step
+    builder.calls.clear()
+    engineer.construct_car(builder)
+    assert builder.get_result() == hard
+    assert builder.calls == []
+
+def test_incremental_mode_boundaries():
+    """
+    TEST 17: Incremental Mode Boundaries
+    Edits to a returned car don't leak into the next build, invalidate() without
+    arguments or turning the mode off forces a full build, and unknown steps are rejected.
+    """
+    builder = CadBuilder().set_incremental()
+    engineer = RaceEngineer()
+    engineer.construct_car(builder)
+    car = builder.get_result()
+    car.engine = "Tampered"
+
+    builder.invalidate("wings")
+    engineer.construct_car(builder)
+    assert builder.get_result().engine == "V6 Turbo"
+
+    builder.invalidate()
+    assert builder.pending_steps() == ("chassis", "engine", "wings", "tires")
+
+    with pytest.raises(ValueError):
+        builder.invalidate("diffuser")
+
+    builder.set_incremental(False)
+    builder.calls.clear()
+    engineer.construct_car(builder)
+    builder.get_result()
+    assert builder.calls == ["chassis", "engine", "wings", "tires"]
+
+def test_memoized_builds_follow_builder_state():
+    """
+    TEST 18: Memo Keys
+    Memoized cars are keyed on the builder's class and settings, and
+    invalidate() drops the cars memoized for that builder class.
+    """
+    class CompoundBuilder(MonacoBuilder):
+        def __init__(self, compound: str = "Soft"):
+            super().__init__()
+            self.compound = compound
+
+        def build_tires(self) -> None:
+            self._car.tires = f"{self.compound} Tires"
+
+    engineer = RaceEngineer()
+    soft = engineer.construct_frozen_car(CompoundBuilder())
+    assert engineer.construct_frozen_car(CompoundBuilder()) is soft
+    assert engineer.construct_frozen_car(CompoundBuilder("Medium")).tires == "Medium Tires"
+
+    builder = CompoundBuilder()
+    builder.compound = "Hard"
+    assert engineer.construct_frozen_car(builder).tires == "Hard Tires"
+
+    monaco = engineer.construct_frozen_car(MonacoBuilder())
+    CompoundBuilder.build_chassis = lambda self: setattr(self._car, "chassis", "Spec B Monocoque")
+    builder = CompoundBuilder()
+    builder.invalidate("chassis")
+    assert engineer.construct_frozen_car(builder).chassis == "Spec B Monocoque"
+    assert engineer.construct_frozen_car(MonacoBuilder()) is monaco
+
+    builder.compound = ["Soft", "Medium"]
+    assert builder.memo_key() is None
+    assert engineer.construct_frozen_car(builder) is not engineer.construct_frozen_car(builder)
+
+def test_slotted_car_memory():
+    """
+    TEST 19: Slotted Car Memory
+    Measured with tracemalloc, a slotted F1Car takes about a third less memory
+    than the same dataclass with a per-instance __dict__ (about 81 vs 121 bytes
+    per car on CPython 3.11).
+    """
+    import dataclasses
+    import tracemalloc
+
+    DictCar = dataclasses.make_dataclass("DictCar", [(name, Optional[str], None) for name in SPEC_FIELDS])
+
+    def bytes_per_car(cls, count=10_000):
+        tracemalloc.start()
+        try:
+            cars = [cls("Chassis", "V6 Turbo", "Front Wing", "Rear Wing", "Soft Tires") for _ in range(count)]
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert len(cars) == count
+        return size / count
+
+    slotted, with_dict = bytes_per_car(F1Car), bytes_per_car(DictCar)
+    assert slotted < with_dict * 0.75
+    assert slotted > with_dict * 0.5
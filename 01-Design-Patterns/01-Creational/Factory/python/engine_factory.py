@@ -1,6 +1,32 @@
 from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from importlib import import_module
+from importlib.metadata import entry_points
+from itertools import count
+from typing import Callable, Hashable, Optional, Union
+from weakref import WeakSet
+import threading
+
+@dataclass(frozen=True)
+class EngineSpec:
+    manufacturer: str
+    displacement_l: float
+    layout: str
+    cylinders: int
+    horsepower: int
+    label: str = field(init=False, compare=False)
+
+    def __post_init__(self):
+        # Formatted once, so get_spec() is a plain attribute read
+        object.__setattr__(self, "label", f"{self.manufacturer} Engine: {self.displacement_l:.1f}L "
+                                          f"{self.layout}{self.cylinders}, {self.horsepower} HP")
 
 class Engine(ABC):
+    stateless = False  # Stateless engines may be shared as flyweights by a pooled factory
+    spec: Optional[EngineSpec] = None
+
     @abstractmethod
     def start(self) -> str:
         pass
@@ -14,6 +40,9 @@ class Engine(ABC):
         pass
 
 class FerrariEngine(Engine):
+    stateless = True
+    spec = EngineSpec("Ferrari", 3.0, "V", 6, 620)
+
     def start(self) -> str:
         return "Bwoah! V6 sounds"
     
@@ -21,9 +50,12 @@ class FerrariEngine(Engine):
         return "Ferrari engine stopped."
     
     def get_spec(self) -> str:
-        return "Ferrari Engine: 3.0L V6, 620 HP"
+        return self.spec.label
     
 class MercedesEngine(Engine):
+    stateless = True
+    spec = EngineSpec("Mercedes", 4.0, "V", 6, 603)
+
     def start(self) -> str:
         return "Hummm! V6 sounds"
     
@@ -31,16 +63,184 @@ class MercedesEngine(Engine):
         return "Mercedes engine stopped."
     
     def get_spec(self) -> str:
-        return "Mercedes Engine: 4.0L V6, 603 HP"
+        return self.spec.label
     
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+class EngineSpecTable:
+    # Columnar view of the specs of every registered engine class, so engines
+    # can be filtered and ranked without instantiating anything.
+    def __init__(self):
+        self.manufacturer: list[str] = []
+        self.engine_cls: list[type] = []
+        self.displacement_l = array("d")
+        self.cylinders = array("B")
+        self.horsepower = array("H")
+
+    def add(self, manufacturer: str, engine_cls: Union[type, str], spec: Optional[EngineSpec] = None) -> None:
+        # Lazily registered engines (dotted paths) only appear once a spec is known;
+        # until then the row of any earlier registration is dropped, not kept stale
+        spec = spec or getattr(engine_cls, "spec", None)
+        self.remove(manufacturer)
+        if spec is None:
+            return
+        self.manufacturer.append(manufacturer)
+        self.engine_cls.append(engine_cls)
+        self.displacement_l.append(spec.displacement_l)
+        self.cylinders.append(spec.cylinders)
+        self.horsepower.append(spec.horsepower)
+
+    def remove(self, manufacturer: str) -> None:
+        if manufacturer in self.manufacturer:
+            row = self.manufacturer.index(manufacturer)
+            for column in (self.manufacturer, self.engine_cls, self.displacement_l, self.cylinders, self.horsepower):
+                del column[row]
+
+    def __len__(self) -> int:
+        return len(self.manufacturer)
+
+    def where(self, column: str, predicate: Callable) -> list[str]:
+        # e.g. table.where("horsepower", lambda hp: hp > 610)
+        values = getattr(self, column)
+        return [self.manufacturer[row] for row, value in enumerate(values) if predicate(value)]
+
+    def ranked(self, column: str, descending: bool = True) -> list[str]:
+        values = getattr(self, column)
+        order = sorted(range(len(values)), key=values.__getitem__, reverse=descending)
+        return [self.manufacturer[row] for row in order]
+
 class EngineFactory:
     _engines = {
         "Ferrari": FerrariEngine,
         "Mercedes": MercedesEngine
     }
+    _lazy_engines: dict[str, str] = {}  # Manufacturer -> "package.module:ClassName", imported on first use
+    _pooled_factories: WeakSet = WeakSet()  # Live pooled instances, flushed when a manufacturer is re-registered
 
-    def get_engine(self, manufacturer: str) -> Engine:
-        engine_cls = self._engines.get(manufacturer)
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Own copies, so registering on a subclass never leaks into its parent
+        cls._engines = dict(cls._engines)
+        cls._lazy_engines = dict(cls._lazy_engines)
+        cls._pooled_factories = WeakSet()
+        cls._build_spec_table()
+
+    @classmethod
+    def _build_spec_table(cls) -> None:
+        cls._specs = EngineSpecTable()
+        for manufacturer, engine_cls in cls._engines.items():
+            cls._specs.add(manufacturer, engine_cls)
+
+    @classmethod
+    def register(cls, manufacturer: str, engine_cls: Union[type, str], spec: Optional[EngineSpec] = None) -> None:
+        # `engine_cls` may be a class or a dotted path that is only imported on first use
+        if isinstance(engine_cls, str):
+            cls._engines.pop(manufacturer, None)
+            cls._lazy_engines[manufacturer] = engine_cls
+        else:
+            cls._lazy_engines.pop(manufacturer, None)
+            cls._engines[manufacturer] = engine_cls
+        cls._specs.add(manufacturer, engine_cls, spec)
+        for factory in list(cls._pooled_factories):
+            factory._evict(manufacturer)
+
+    @classmethod
+    def load_entry_points(cls, group: str = "f1_lab.engines") -> None:
+        # Declares every installed plugin of `group` lazily; nothing is imported yet
+        for entry_point in entry_points(group=group):
+            cls.register(entry_point.name, entry_point.value)
+
+    @classmethod
+    def _resolve(cls, manufacturer: str) -> Optional[type]:
+        path = cls._lazy_engines.get(manufacturer)
+        if path is None:
+            return None
+        module_name, _, class_name = path.rpartition(":") if ":" in path else path.rpartition(".")
+        engine_cls = getattr(import_module(module_name), class_name)
+        # Cached, so every later lookup is a single dict hit
+        cls._engines[manufacturer] = engine_cls
+        cls._lazy_engines.pop(manufacturer, None)
+        cls._specs.add(manufacturer, engine_cls)
+        return engine_cls
+
+    @classmethod
+    def spec_table(cls) -> EngineSpecTable:
+        return cls._specs
+
+    def __init__(self, pooled: bool = False, pool_size: int = 128):
+        # Pooled factories hand out one shared instance per stateless engine type.
+        # Engines that carry state are only reused for the same owner (e.g. a car),
+        # kept in a bounded LRU pool.
+        self.pooled = pooled
+        self.pool_size = pool_size
+        self._stats = PoolStats()
+        self._flyweights: dict[str, Engine] = {}
+        self._owned: OrderedDict[tuple[str, Hashable], Engine] = OrderedDict()
+        self._pool_lock = threading.Lock()
+        # Flyweight hits advance an itertools.count, which is atomic in CPython, so
+        # the hit path takes no lock. Reading the counter advances it too, so
+        # stats subtracts the number of earlier reads.
+        self._flyweight_hits = count()
+        self._hit_reads = 0
+        if pooled:
+            type(self)._pooled_factories.add(self)
+
+    @property
+    def stats(self) -> PoolStats:
+        with self._pool_lock:
+            flyweight_hits = next(self._flyweight_hits) - self._hit_reads
+            self._hit_reads += 1
+            return PoolStats(hits=self._stats.hits + flyweight_hits,
+                             misses=self._stats.misses, evictions=self._stats.evictions)
+
+    def _evict(self, manufacturer: str) -> None:
+        # Drops cached engines of a manufacturer whose class was replaced
+        with self._pool_lock:
+            self._flyweights.pop(manufacturer, None)
+            for key in [key for key in self._owned if key[0] == manufacturer]:
+                del self._owned[key]
+
+    def get_engine(self, manufacturer: str, owner: Optional[Hashable] = None) -> Engine:
+        if self.pooled:
+            engine = self._flyweights.get(manufacturer)
+            if engine is not None:
+                next(self._flyweight_hits)
+                return engine
+        engine_cls = self._engines.get(manufacturer) or self._resolve(manufacturer)
         if not engine_cls:
             raise ValueError(f"Unknown manufacturer: {manufacturer}")
-        return engine_cls()
\ No newline at end of file
+        if not self.pooled:
+            return engine_cls()
+        if engine_cls.stateless:
+            with self._pool_lock:
+                engine = self._flyweights.get(manufacturer)
+                if engine is not None:
+                    self._stats.hits += 1
+                    return engine
+                self._stats.misses += 1
+                engine = self._flyweights[manufacturer] = engine_cls()
+                return engine
+        if owner is None:
+            return engine_cls()
+        return self._get_owned_engine(manufacturer, owner, engine_cls)
+
+    def _get_owned_engine(self, manufacturer: str, owner: Hashable, engine_cls: type) -> Engine:
+        key = (manufacturer, owner)
+        with self._pool_lock:
+            engine = self._owned.get(key)
+            if engine is not None:
+                self._owned.move_to_end(key)
+                self._stats.hits += 1
+                return engine
+            self._stats.misses += 1
+            engine = self._owned[key] = engine_cls()
+            if len(self._owned) > self.pool_size:
+                self._owned.popitem(last=False)
+                self._stats.evictions += 1
+            return engine
+
+EngineFactory._build_spec_table()
@@ -1,6 +1,6 @@
 import pytest
 from abc import ABC
-from engine_factory import EngineFactory, FerrariEngine, MercedesEngine, Engine
+from engine_factory import EngineFactory, FerrariEngine, MercedesEngine, Engine, EngineSpec
 
 def test_interface_enforcement():
     """
@@ -79,3 +79,291 @@ def test_engine_stop_method():
     # Ensure that calling stop() does not raise and returns a string (or at least a truthy value)
     assert isinstance(ferrari_stop_result, str)
     assert isinstance(mercedes_stop_result, str)
+
+class HondaEngine(Engine):
+    """Stateful test engine: remembers how many laps it has done."""
+    def __init__(self):
+        self.laps = 0
+
+    def start(self) -> str:
+        self.laps += 1
+        return "Honda engine started."
+
+    def stop(self) -> str:
+        return "Honda engine stopped."
+
+    def get_spec(self) -> str:
+        return "Honda Engine: 1.6L V6, 600 HP"
+
+class CustomerEngineFactory(EngineFactory):
+    _engines = {**EngineFactory._engines, "Honda": HondaEngine}
+
+def test_pooled_factory_shares_stateless_engines():
+    """
+    TEST 6: Flyweight Pooling
+    A pooled factory must hand out one shared instance per stateless engine type,
+    while the default factory keeps creating fresh engines.
+    """
+    pooled = EngineFactory(pooled=True)
+    assert pooled.get_engine("Ferrari") is pooled.get_engine("Ferrari")
+    assert pooled.get_engine("Ferrari") is not pooled.get_engine("Mercedes")
+    assert pooled.stats.misses == 2
+    assert pooled.stats.hits == 2
+
+    plain = EngineFactory()
+    assert plain.get_engine("Ferrari") is not plain.get_engine("Ferrari")
+
+    with pytest.raises(ValueError):
+        pooled.get_engine("Trabi")
+
+def test_pooled_factory_lru_for_stateful_engines():
+    """
+    TEST 7: Bounded LRU Pool
+    Stateful engines are only reused for the same owner, and the least
+    recently used owner is evicted once the pool is full.
+    """
+    factory = CustomerEngineFactory(pooled=True, pool_size=2)
+
+    car_1 = factory.get_engine("Honda", owner="car-1")
+    car_1.start()
+    assert factory.get_engine("Honda", owner="car-1") is car_1
+    assert factory.get_engine("Honda", owner="car-1").laps == 1
+    assert factory.get_engine("Honda", owner="car-2") is not car_1
+    assert factory.get_engine("Honda") is not factory.get_engine("Honda")  # No owner, no sharing
+
+    factory.get_engine("Honda", owner="car-1")  # car-2 is now least recently used
+    factory.get_engine("Honda", owner="car-3")
+    assert factory.stats.evictions == 1
+    assert factory.get_engine("Honda", owner="car-1") is car_1
+    assert factory.stats.misses == 3
+
+def test_pooled_factory_allocations():
+    """
+    TEST 8: Pooled Allocations
+    Repeated get_engine() calls on a pooled factory allocate no new engines,
+    while a fresh factory allocates one per call. Speed is checked by
+    `benchmarks.py targets`.
+    """
+    import tracemalloc
+
+    allocated = {}
+    for pooled in (False, True):
+        factory = EngineFactory(pooled=pooled)
+        factory.get_engine("Mercedes")
+        tracemalloc.start()
+        engines = [factory.get_engine("Mercedes") for _ in range(1_000)]
+        allocated[pooled], _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len({id(engine) for engine in engines}) == (1 if pooled else 1_000)
+        del engines
+
+    assert allocated[True] * 5 < allocated[False]
+
+def test_structured_engine_specs():
+    """
+    TEST 9: Structured Specs
+    Every concrete engine carries a typed spec record, and get_spec() keeps
+    returning the same human-readable string built from it.
+    """
+    assert FerrariEngine.spec == EngineSpec("Ferrari", 3.0, "V", 6, 620)
+    assert FerrariEngine().get_spec() == "Ferrari Engine: 3.0L V6, 620 HP"
+    assert MercedesEngine().get_spec() == "Mercedes Engine: 4.0L V6, 603 HP"
+    assert MercedesEngine.spec.horsepower == 603
+
+def test_spec_table_queries_without_instantiation():
+    """
+    TEST 10: Columnar Spec Table
+    The spec table is filled at registration time and can be filtered and
+    ranked without creating a single engine.
+    """
+    class SpecOnlyEngine(Engine):
+        spec = EngineSpec("Audi", 1.6, "V", 6, 640)
+
+        def __init__(self):
+            pytest.fail("Spec queries must not instantiate engines")
+
+        def start(self) -> str:
+            return "Audi engine started."
+
+        def stop(self) -> str:
+            return "Audi engine stopped."
+
+        def get_spec(self) -> str:
+            return self.spec.label
+
+    class WorksEngineFactory(EngineFactory):
+        pass
+
+    WorksEngineFactory.register("Audi", SpecOnlyEngine)
+    table = WorksEngineFactory.spec_table()
+
+    assert len(table) == 3
+    assert table.where("horsepower", lambda hp: hp > 610) == ["Ferrari", "Audi"]
+    assert table.ranked("horsepower") == ["Audi", "Ferrari", "Mercedes"]
+    assert table.ranked("displacement_l", descending=False)[0] == "Audi"
+
+    # The parent factory and its table are untouched
+    assert "Audi" not in EngineFactory._engines
+    assert len(EngineFactory.spec_table()) == 2
+
+PLUGIN_SOURCE = '''
+from engine_factory import Engine, EngineSpec
+
+class {name}Engine(Engine):
+    spec = EngineSpec("{name}", 1.6, "V", 6, {hp})
+
+    def start(self) -> str:
+        return "{name} engine started."
+
+    def stop(self) -> str:
+        return "{name} engine stopped."
+
+    def get_spec(self) -> str:
+        return self.spec.label
+'''
+
+def write_plugins(directory, count, prefix):
+    names = [f"{prefix}{index}" for index in range(count)]
+    for index, name in enumerate(names):
+        (directory / f"{name.lower()}_engine.py").write_text(PLUGIN_SOURCE.format(name=name, hp=600 + index))
+    return names
+
+def test_lazy_plugin_registry(tmp_path, monkeypatch):
+    """
+    TEST 11: Lazy Plugin Registry
+    Manufacturers declared by dotted path or entry point are only imported on
+    the first get_engine() call and then cached.
+    """
+    import sys
+    from importlib.metadata import EntryPoint
+    import engine_factory
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    write_plugins(tmp_path, 2, "Lazy")
+    monkeypatch.setattr(engine_factory, "entry_points", lambda group: [
+        EntryPoint(name="Lazy1", value="lazy1_engine:Lazy1Engine", group=group)])
+
+    class PluginEngineFactory(EngineFactory):
+        pass
+
+    PluginEngineFactory.register("Lazy0", "lazy0_engine.Lazy0Engine")
+    PluginEngineFactory.load_entry_points()
+    assert "lazy0_engine" not in sys.modules
+    assert "lazy1_engine" not in sys.modules
+
+    engine = PluginEngineFactory().get_engine("Lazy1")
+    assert engine.get_spec() == "Lazy1 Engine: 1.6L V6, 601 HP"
+    assert "lazy1_engine" in sys.modules
+    assert "lazy0_engine" not in sys.modules
+    assert PluginEngineFactory._engines["Lazy1"] is type(engine)
+    assert PluginEngineFactory.spec_table().where("horsepower", lambda hp: hp == 601) == ["Lazy1"]
+    assert "Lazy1" not in EngineFactory._engines
+
+    for name in ("lazy0_engine", "lazy1_engine"):
+        sys.modules.pop(name, None)
+
+def test_lazy_registry_at_scale(tmp_path, monkeypatch):
+    """
+    TEST 12: Lazy Declarations at Scale (500 Manufacturers)
+    Declaring 500 plugin manufacturers lazily must not import any of them, and
+    first use imports only the one that is asked for. The speedup over eager
+    imports is checked by `benchmarks.py targets`.
+    """
+    import importlib
+    import sys
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    names = write_plugins(tmp_path, 500, "Bench")
+    modules = [f"{name.lower()}_engine" for name in names]
+    importlib.invalidate_caches()
+
+    class LazyCatalogue(EngineFactory):
+        pass
+
+    for name, module in zip(names, modules):
+        LazyCatalogue.register(name, f"{module}:{name}Engine")
+    assert not any(module in sys.modules for module in modules)
+
+    engine = LazyCatalogue().get_engine("Bench42")
+    assert engine.get_spec() == "Bench42 Engine: 1.6L V6, 642 HP"
+    assert [module for module in modules if module in sys.modules] == ["bench42_engine"]
+
+    sys.modules.pop("bench42_engine", None)
+
+def test_pool_stats_are_exact_under_threads():
+    """
+    TEST 13: Thread-Safe Pool Statistics
+    Concurrent flyweight lookups from many threads are all counted, and only one
+    shared instance is ever created.
+    """
+    import threading
+
+    factory = EngineFactory(pooled=True)
+    engines = []
+
+    def worker():
+        engines.extend(factory.get_engine("Ferrari") for _ in range(2_000))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(engine) for engine in engines}) == 1
+    assert factory.stats.misses == 1
+    assert factory.stats.hits + factory.stats.misses == 16_000
+
+def test_register_flushes_pooled_engines():
+    """
+    TEST 14: Re-Registration
+    Registering a manufacturer again drops its pooled engines, so pooled
+    factories hand out the new class instead of a stale instance.
+    """
+    class TuningEngineFactory(CustomerEngineFactory):
+        pass
+
+    class TunedFerrariEngine(FerrariEngine):
+        pass
+
+    factory = TuningEngineFactory(pooled=True)
+    stale = factory.get_engine("Ferrari")
+    owned = factory.get_engine("Honda", owner="car-1")
+    mercedes = factory.get_engine("Mercedes")
+
+    TuningEngineFactory.register("Ferrari", TunedFerrariEngine)
+    TuningEngineFactory.register("Honda", HondaEngine)
+
+    fresh = factory.get_engine("Ferrari")
+    assert type(fresh) is TunedFerrariEngine
+    assert factory.get_engine("Ferrari") is fresh
+    assert factory.get_engine("Honda", owner="car-1") is not owned
+    assert factory.get_engine("Mercedes") is mercedes
+    assert type(EngineFactory(pooled=True).get_engine("Ferrari")) is FerrariEngine
+    assert stale is not fresh
+
+def test_lazy_re_registration_drops_stale_spec(tmp_path, monkeypatch):
+    """
+    TEST 15: Lazy Re-Registration
+    Re-registering a manufacturer by dotted path removes its old spec row until
+    the new class is imported, so queries never rank the replaced engine.
+    """
+    import sys
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    write_plugins(tmp_path, 1, "Retuned")
+
+    class RetuningEngineFactory(EngineFactory):
+        pass
+
+    RetuningEngineFactory.register("Ferrari", "retuned0_engine:Retuned0Engine")
+    table = RetuningEngineFactory.spec_table()
+    assert "Ferrari" not in table.manufacturer
+    assert table.where("horsepower", lambda hp: hp > 610) == []
+    assert len(table.manufacturer) == len(table.horsepower) == 1
+
+    RetuningEngineFactory().get_engine("Ferrari")
+    assert table.where("horsepower", lambda hp: hp == 600) == ["Ferrari"]
+    assert len(EngineFactory.spec_table()) == 2
+
+    sys.modules.pop("retuned0_engine", None)
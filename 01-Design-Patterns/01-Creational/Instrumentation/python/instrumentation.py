@@ -0,0 +1,233 @@
+from array import array
+from functools import wraps
+from importlib import import_module
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Optional
+import sys
+import threading
+
+# Sibling pattern folders (e.g. Factory/python) holding the modules with hot paths
+_CREATIONAL_DIR = Path(__file__).resolve().parents[2]
+_import_lock = threading.RLock()
+
+class LatencyHistogram:
+    # HDR-style log-linear histogram with fixed memory: values below 32 ns get a
+    # bucket each, and every power of two above that is split into 16 equal
+    # sub-buckets, so any value up to 2**64 ns is recorded within 1/16 (6.25%).
+    SUB_BUCKET_BITS = 4
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * ((65 - self.SUB_BUCKET_BITS) << self.SUB_BUCKET_BITS)))
+        self.count = 0
+        self.sum_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self._lock = threading.Lock()
+
+    # A value keeps its top SUB_BUCKET_BITS + 1 bits: value >> shift lies in
+    # [16, 32) once shift > 0, and buckets of consecutive shifts line up end to end.
+    @classmethod
+    def _index(cls, value: int) -> int:
+        shift = max(value.bit_length() - cls.SUB_BUCKET_BITS - 1, 0)
+        return (shift << cls.SUB_BUCKET_BITS) + (value >> shift)
+
+    @classmethod
+    def _upper_bound(cls, index: int) -> int:
+        shift = max((index >> cls.SUB_BUCKET_BITS) - 1, 0)
+        return ((index - (shift << cls.SUB_BUCKET_BITS) + 1) << shift) - 1
+
+    def record(self, value_ns: int) -> None:
+        value_ns = max(value_ns, 0)
+        with self._lock:
+            self.counts[self._index(value_ns)] += 1
+            self.min_ns = value_ns if not self.count else min(self.min_ns, value_ns)
+            self.max_ns = max(self.max_ns, value_ns)
+            self.count += 1
+            self.sum_ns += value_ns
+
+    def percentile(self, percent: float) -> int:
+        # Upper bound of the bucket holding the given percentile, capped at the max seen
+        if not self.count:
+            return 0
+        target = max(1, round(self.count * percent / 100))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= target:
+                return min(self._upper_bound(index), self.max_ns)
+        return self.max_ns
+
+    def buckets(self) -> list[tuple[int, int]]:
+        # (upper bound ns, cumulative count) for every non-empty bucket
+        cumulative, result = 0, []
+        for index, bucket in enumerate(self.counts):
+            if bucket:
+                cumulative += bucket
+                result.append((self._upper_bound(index), cumulative))
+        return result
+
+class _TimedLock:
+    # Lock or Condition stand-in that records how long acquiring the wrapped one
+    # took. Everything else (wait, notify_all, locked, ...) goes to the original.
+    def __init__(self, inner, histogram: LatencyHistogram):
+        self._inner = inner
+        self._histogram = histogram
+
+    def acquire(self, *args, **kwargs) -> bool:
+        start = perf_counter_ns()
+        acquired = self._inner.acquire(*args, **kwargs)
+        self._histogram.record(perf_counter_ns() - start)
+        return acquired
+
+    def release(self) -> None:
+        self._inner.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._inner.release()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+class Instrumentation:
+    # Opt-in hot-path metrics. Targets are patched in place while enabled and the
+    # original functions and locks are put back on disable(), so disabled code
+    # paths run exactly as they would without this module.
+    def __init__(self):
+        self.metrics: dict[str, LatencyHistogram] = {}
+        self._targets: list[tuple[str, object, str, str]] = []
+        self._originals: list[tuple[object, str, object]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._originals)
+
+    def _histogram(self, name: str) -> LatencyHistogram:
+        return self.metrics.setdefault(name, LatencyHistogram())
+
+    def instrument_method(self, owner: type, attr: str, name: Optional[str] = None) -> None:
+        self._targets.append(("method", owner, attr, name or f"{owner.__name__}.{attr}"))
+
+    def instrument_lock(self, owner: object, attr: str, name: Optional[str] = None) -> None:
+        label = owner.__name__ if isinstance(owner, type) else type(owner).__name__
+        self._targets.append(("lock", owner, attr, name or f"{label}.{attr}.wait"))
+
+    def enable(self) -> "Instrumentation":
+        # All or nothing: every target is looked up before the first one is patched,
+        # and a failure while patching puts back what was already patched
+        if self.enabled:
+            return self
+        originals = []
+        for kind, owner, attr, name in self._targets:
+            if isinstance(owner, type) and attr not in owner.__dict__:
+                raise AttributeError(f"{owner.__name__} does not define {attr} itself; "
+                                     f"instrument the class that does")
+            originals.append(owner.__dict__[attr] if isinstance(owner, type) else getattr(owner, attr))
+        try:
+            for (kind, owner, attr, name), original in zip(self._targets, originals):
+                histogram = self._histogram(name)
+                if kind == "lock":
+                    patched = _TimedLock(original, histogram)
+                else:
+                    patched = self._timed(original, histogram)
+                setattr(owner, attr, patched)
+                self._originals.append((owner, attr, original))
+        except BaseException:
+            self.disable()
+            raise
+        return self
+
+    @staticmethod
+    def _timed(function, histogram: LatencyHistogram):
+        if isinstance(function, (staticmethod, classmethod)):
+            return type(function)(Instrumentation._timed(function.__func__, histogram))
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.record(perf_counter_ns() - start)
+        return timed
+
+    def disable(self) -> None:
+        while self._originals:
+            owner, attr, original = self._originals.pop()
+            setattr(owner, attr, original)
+
+    def __enter__(self) -> "Instrumentation":
+        return self.enable()
+
+    def __exit__(self, *exc_info) -> None:
+        self.disable()
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        return {name: {"count": histogram.count,
+                       "sum_ns": histogram.sum_ns,
+                       "min_ns": histogram.min_ns,
+                       "max_ns": histogram.max_ns,
+                       "p50_ns": histogram.percentile(50),
+                       "p90_ns": histogram.percentile(90),
+                       "p99_ns": histogram.percentile(99)}
+                for name, histogram in self.metrics.items()}
+
+    def to_prometheus(self, metric: str = "f1lab_operation_latency_seconds") -> str:
+        lines = [f"# HELP {metric} Latency of instrumented operations and lock waits.",
+                 f"# TYPE {metric} histogram"]
+        for name, histogram in self.metrics.items():
+            for upper_ns, cumulative in histogram.buckets():
+                lines.append(f'{metric}_bucket{{op="{name}",le="{upper_ns / 1e9:.9g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{op="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{metric}_sum{{op="{name}"}} {histogram.sum_ns / 1e9:.9g}')
+            lines.append(f'{metric}_count{{op="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+def import_pattern_module(folder: str, module: str):
+    # Imports `module` from a sibling pattern folder; the benchmark runner uses it too.
+    # The folder is only on sys.path for the import itself (sibling imports included),
+    # so it never shadows other modules afterwards.
+    path = str(_CREATIONAL_DIR / folder / "python")
+    with _import_lock:
+        added = path not in sys.path
+        if added:
+            sys.path.append(path)
+        try:
+            return import_module(module)
+        finally:
+            if added:
+                sys.path.remove(path)
+
+def instrument_hot_paths(instrumentation: Optional[Instrumentation] = None) -> Instrumentation:
+    # Registers and enables the hot paths of every creational pattern module:
+    # get_engine, create_ice/create_ers, construct_car, clone, update_status and
+    # the RaceControl/Singleton locks.
+    instrumentation = instrumentation or Instrumentation()
+    engine_factory = import_pattern_module("Factory", "engine_factory")
+    power_unit_factory = import_pattern_module("Abstract-Factory", "power_unit_factory")
+    f1_car_builder = import_pattern_module("Builder", "f1_car_builder")
+    car_setup = import_pattern_module("Prototype", "car_setup")
+    race_control = import_pattern_module("Singleton", "race_control")
+
+    instrumentation.instrument_method(engine_factory.EngineFactory, "get_engine")
+    pending = list(power_unit_factory.TeamFactory.__subclasses__())
+    while pending:
+        factory_cls = pending.pop()
+        pending.extend(factory_cls.__subclasses__())
+        for attr in ("create_ice", "create_ers"):
+            if attr in factory_cls.__dict__:
+                instrumentation.instrument_method(factory_cls, attr)
+    instrumentation.instrument_method(f1_car_builder.RaceEngineer, "construct_car")
+    instrumentation.instrument_method(car_setup.CarSetup, "clone")
+
+    RaceControl = race_control.RaceControl
+    rc = RaceControl.get_instance()
+    instrumentation.instrument_method(RaceControl, "update_status")
+    instrumentation.instrument_lock(rc, "_lock", "RaceControl.lock.wait")
+    instrumentation.instrument_lock(rc, "_changed", "RaceControl.lock.wait")
+    instrumentation.instrument_lock(RaceControl, "_singleton_lock", "Singleton[RaceControl].lock.wait")
+    return instrumentation.enable()
@@ -0,0 +1,179 @@
+import threading
+from instrumentation import Instrumentation, LatencyHistogram, instrument_hot_paths
+
+def test_histogram_percentiles():
+    """
+    TEST 1: HDR-Style Histogram
+    Percentiles stay within the bucket precision (1/16), every counter is
+    reachable, and memory stays fixed.
+    """
+    histogram = LatencyHistogram()
+    size = len(histogram.counts)
+    for value in range(1, 10_001):
+        histogram.record(value)
+
+    assert len(histogram.counts) == size
+    assert histogram.count == 10_000
+    assert (histogram.min_ns, histogram.max_ns) == (1, 10_000)
+    for percent, exact in ((50, 5_000), (90, 9_000), (99, 9_900)):
+        assert exact <= histogram.percentile(percent) <= exact * 17 / 16
+    assert histogram.percentile(100) == 10_000
+    assert LatencyHistogram().percentile(50) == 0
+
+    # Every slot is reachable, and a bucket's upper bound overstates its values by under 1/16
+    indexes = set()
+    for bits in range(65):
+        for value in {(1 << bits) - 1, 1 << bits, (3 << bits) // 2}:
+            if value < 1 << 64:
+                index = LatencyHistogram._index(value)
+                indexes.add(index)
+                assert value <= LatencyHistogram._upper_bound(index) < value * 17 / 16 + 1
+    assert max(indexes) == size - 1
+    small = {LatencyHistogram._index(value) for value in range(1 << 12)}
+    assert small == set(range(len(small)))
+
+def test_instrument_method_and_restore():
+    """
+    TEST 2: Zero-Cost When Disabled
+    Enabling wraps the target; disabling puts back the exact original function.
+    """
+    class PitWall:
+        def radio(self, message):
+            return message.upper()
+
+    original = PitWall.__dict__["radio"]
+    instrumentation = Instrumentation()
+    instrumentation.instrument_method(PitWall, "radio")
+
+    with instrumentation:
+        assert instrumentation.enabled
+        assert PitWall.__dict__["radio"] is not original
+        assert PitWall().radio("box box") == "BOX BOX"
+        assert PitWall().radio("stay out") == "STAY OUT"
+
+    assert not instrumentation.enabled
+    assert PitWall.__dict__["radio"] is original
+    assert instrumentation.snapshot()["PitWall.radio"]["count"] == 2
+
+def test_hot_paths_are_instrumented():
+    """
+    TEST 3: Hot-Path Coverage
+    Every creational hot path reports counts and latencies, including lock waits.
+    """
+    instrumentation = instrument_hot_paths()  # Also imports the pattern modules
+    import engine_factory
+    import f1_car_builder
+    import car_setup
+    import power_unit_factory
+    import race_control
+
+    rc = race_control.RaceControl.get_instance()
+    original_lock = rc._lock._inner
+    try:
+        engine_factory.EngineFactory().get_engine("Ferrari")
+        power_unit_factory.FerrariFactory().create_power_units(2)
+        builder = f1_car_builder.MonzaBuilder()
+        f1_car_builder.RaceEngineer().construct_car(builder)
+        setup = car_setup.CarSetup(4, 21.0, car_setup.EngineConfiguration("Race", [1, 2]))
+        setup.clone()
+        rc.update_status("YELLOW")
+        rc.update_status("GREEN")
+        rc.subscribe(lambda status: None)()
+    finally:
+        instrumentation.disable()
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot["EngineFactory.get_engine"]["count"] == 1
+    assert snapshot["FerrariFactory.create_ice"]["count"] == 2
+    assert snapshot["FerrariFactory.create_ers"]["count"] == 2
+    assert snapshot["RaceEngineer.construct_car"]["count"] == 1
+    assert snapshot["CarSetup.clone"]["count"] == 1
+    assert snapshot["RaceControl.update_status"]["count"] == 2
+    assert snapshot["RaceControl.lock.wait"]["count"] == 4
+    assert "Singleton[RaceControl].lock.wait" in snapshot
+    assert rc._lock is original_lock
+    assert isinstance(rc._changed, threading.Condition)
+
+def test_lock_wait_under_contention():
+    """
+    TEST 4: Lock-Wait Time
+    Time spent waiting for a held lock shows up in its histogram.
+    """
+    class Marshal:
+        def __init__(self):
+            self.lock = threading.Lock()
+
+    marshal = Marshal()
+    instrumentation = Instrumentation()
+    instrumentation.instrument_lock(marshal, "lock")
+
+    with instrumentation:
+        marshal.lock.acquire()
+        waiter = threading.Thread(target=lambda: marshal.lock.acquire() and marshal.lock.release())
+        waiter.start()
+        threading.Event().wait(0.02)
+        marshal.lock.release()
+        waiter.join()
+
+    assert instrumentation.snapshot()["Marshal.lock.wait"]["max_ns"] >= 10_000_000
+
+def test_prometheus_export():
+    """
+    TEST 5: Prometheus Text Export
+    Metrics are exported as a cumulative Prometheus histogram per operation.
+    """
+    instrumentation = Instrumentation()
+    histogram = instrumentation._histogram("EngineFactory.get_engine")
+    for value in (100, 200, 200, 5_000):
+        histogram.record(value)
+
+    text = instrumentation.to_prometheus()
+
+    assert "# TYPE f1lab_operation_latency_seconds histogram" in text
+    assert 'f1lab_operation_latency_seconds_bucket{op="EngineFactory.get_engine",le="+Inf"} 4' in text
+    assert 'f1lab_operation_latency_seconds_count{op="EngineFactory.get_engine"} 4' in text
+    buckets = [int(line.rsplit(" ", 1)[1]) for line in text.splitlines() if "_bucket" in line]
+    assert buckets == sorted(buckets)
+
+def test_enable_is_all_or_nothing():
+    """
+    TEST 6: All-or-Nothing Enable
+    A target that can't be patched leaves every other target untouched, and
+    importing the pattern modules leaves sys.path as it was.
+    """
+    import sys
+    import pytest
+    from instrumentation import import_pattern_module
+
+    class PitWall:
+        def radio(self, message):
+            return message
+
+    class MonacoPitWall(PitWall):
+        pass
+
+    class Marshal:
+        flag_lock = property(lambda self: threading.Lock())
+
+    original = PitWall.__dict__["radio"]
+    inherited = Instrumentation()
+    inherited.instrument_method(PitWall, "radio")
+    inherited.instrument_method(MonacoPitWall, "radio")
+    with pytest.raises(AttributeError):
+        inherited.enable()
+    assert not inherited.enabled
+    assert PitWall.__dict__["radio"] is original
+    assert inherited.metrics == {}
+
+    read_only = Instrumentation()
+    read_only.instrument_method(PitWall, "radio")
+    read_only.instrument_lock(Marshal(), "flag_lock")
+    with pytest.raises(AttributeError):
+        read_only.enable()
+    assert not read_only.enabled
+    assert PitWall.__dict__["radio"] is original
+
+    path = list(sys.path)
+    assert import_pattern_module("Builder", "f1_car_builder").MonzaBuilder
+    assert import_pattern_module("Prototype", "setup_registry").SetupRegistry
+    assert sys.path == path
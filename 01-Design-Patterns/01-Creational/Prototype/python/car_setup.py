@@ -1,21 +1,546 @@
 from abc import ABC, abstractmethod
+from array import array
+from collections.abc import MutableSequence
 import copy
+from itertools import accumulate, repeat
+from math import floor
+from numbers import Real
+from operator import add, floordiv, mod, mul, sub
+from typing import Iterable, Optional, Union
 
 class Prototype(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def clone(self):
         pass
 
+class TorqueMap(MutableSequence):
+    # List-like torque map; the buffer is shared between copy-on-write clones
+    # and only copied by the first clone that writes to it. Compact maps keep
+    # the points in a contiguous array('i') instead of a list of boxed ints, or
+    # view a read-only int32 buffer (e.g. a memory-mapped file) until written.
+    __slots__ = ("_values", "_shared")
+
+    def __init__(self, values=(), compact: Optional[bool] = None):
+        if compact is None:
+            compact = isinstance(values, array)
+        self._values = array("i", values) if compact else list(values)
+        self._shared = False
+
+    @classmethod
+    def from_buffer(cls, view: memoryview) -> "TorqueMap":
+        # Zero-copy: the buffer is treated as shared and copied on the first write
+        torque_map = cls.__new__(cls)
+        torque_map._values = view
+        torque_map._shared = True
+        return torque_map
+
+    @property
+    def compact(self) -> bool:
+        return not isinstance(self._values, list)
+
+    @staticmethod
+    def _copy(values):
+        # Buffer views are copied into an owned array with one memcpy
+        if isinstance(values, memoryview):
+            copied = array("i")
+            with values.cast("B") as raw:
+                copied.frombytes(raw)
+            return copied
+        return values[:]
+
+    def share(self) -> "TorqueMap":
+        twin = TorqueMap.__new__(TorqueMap)
+        twin._values = self._values
+        twin._shared = self._shared = True
+        return twin
+
+    def _replace(self, values, shared: bool = False) -> None:
+        # Swaps in a new buffer wholesale, e.g. the result of a TorqueTransform
+        self._values = values
+        self._shared = shared
+
+    def _detach(self) -> None:
+        if self._shared:
+            self._values = self._copy(self._values)
+            self._shared = False
+
+    def __getitem__(self, index):
+        # Slices are plain lists whatever the storage, like slicing the list it replaces
+        if isinstance(index, slice):
+            values = self._values[index]
+            return values if isinstance(values, list) else values.tolist()
+        return self._values[index]
+
+    def __setitem__(self, index, value) -> None:
+        self._detach()
+        if isinstance(index, slice) and self.compact and not isinstance(value, array):
+            value = array("i", value)
+        self._values[index] = value
+
+    def __delitem__(self, index) -> None:
+        self._detach()
+        del self._values[index]
+
+    def insert(self, index: int, value: int) -> None:
+        self._detach()
+        self._values.insert(index, value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TorqueMap):
+            other = other._values
+        elif not isinstance(other, list):
+            return NotImplemented
+        if type(self._values) is type(other):
+            return self._values == other
+        return len(self._values) == len(other) and all(a == b for a, b in zip(self._values, other))
+
+    def tolist(self) -> list[int]:
+        # Plain list copy, e.g. for json.dumps() or callers that need a real list
+        return self._values.tolist() if self.compact else self._values[:]
+
+    def __reduce__(self):
+        # Views into a mapped file can't be pickled, so they travel as an array
+        values = self._copy(self._values) if isinstance(self._values, memoryview) else self._values
+        return TorqueMap, (values, self.compact)
+
+    def __copy__(self) -> "TorqueMap":
+        # A shallow copy must not write through to the original, so it is a twin
+        return self.share()
+
+    def __deepcopy__(self, memo=None) -> "TorqueMap":
+        # A single slice copy; for compact maps this is one memcpy of the buffer
+        values = self._values
+        twin = TorqueMap.__new__(TorqueMap)
+        twin._values = values[:] if type(values) is not memoryview else self._copy(values)
+        twin._shared = False
+        return twin
+
+    def __repr__(self) -> str:
+        return f"TorqueMap({self.tolist()!r})"
+
 class EngineConfiguration():
-    def __init__(self, mode: str, torque_map: list[int]):
+    __slots__ = ("mode", "_torque_map")
+
+    def __init__(self, mode: str, torque_map: list[int], compact: bool = False):
         self.mode = mode
-        self.torque_map = torque_map
+        self.torque_map = TorqueMap(torque_map, compact=True) if compact else torque_map
+
+    @property
+    def torque_map(self) -> Union[list, TorqueMap]:
+        return self._torque_map
+
+    @torque_map.setter
+    def torque_map(self, values) -> None:
+        # Lists are kept as they are, aliasing included; other storage (arrays,
+        # buffers) goes through a TorqueMap
+        self._torque_map = values if isinstance(values, (list, TorqueMap)) else TorqueMap(values)
+
+    def share(self) -> "EngineConfiguration":
+        # New configuration whose torque map is shared until either side writes to it.
+        # A plain list is copied into a TorqueMap first, so nobody else holds its buffer.
+        if not isinstance(self._torque_map, TorqueMap):
+            self._torque_map = TorqueMap(self._torque_map)
+        return EngineConfiguration(self.mode, self._torque_map.share())
+
+    # Single-step transforms of the torque map, in place; chain them through a
+    # TorqueTransform to run several steps in one pass
+    def scale(self, factor: float) -> "EngineConfiguration":
+        return TorqueTransform().scale(factor).apply(self)
+
+    def offset(self, delta: int) -> "EngineConfiguration":
+        return TorqueTransform().offset(delta).apply(self)
+
+    def clamp(self, low=None, high=None) -> "EngineConfiguration":
+        return TorqueTransform().clamp(low, high).apply(self)
+
+    def smooth(self, window: int) -> "EngineConfiguration":
+        return TorqueTransform().smooth(window).apply(self)
+
+    def resample(self, points: int) -> "EngineConfiguration":
+        return TorqueTransform().resample(points).apply(self)
+
+Bound = Union[None, Real, Iterable[Real]]
+
+class TorqueTransform:
+    # Reusable pipeline of torque-map transforms, applied in place. Runs of
+    # pointwise steps (scale, offset, scalar clamps) are fused: when the map's
+    # value range is no wider than the map itself, they are evaluated once per
+    # distinct torque value into a lookup table, otherwise as one chain of C-level
+    # map() iterators. Either way each map is read and written once per run, not
+    # once per step. Every step rounds to whole Nm half up (2.5 -> 3, -2.5 -> -2),
+    # and results keep the map's storage (list or compact array); copy-on-write
+    # twins keep the old buffer.
+    __slots__ = ("steps",)
+
+    def __init__(self):
+        self.steps: list[tuple[str, object]] = []
+
+    def scale(self, factor: float) -> "TorqueTransform":
+        self.steps.append(("scale", factor))
+        return self
+
+    def offset(self, delta: int) -> "TorqueTransform":
+        self.steps.append(("offset", self._round(delta)))
+        return self
+
+    def clamp(self, low: Bound = None, high: Bound = None) -> "TorqueTransform":
+        # Bounds are numbers or one value per point (e.g. a cap for every RPM band)
+        for kind, bound in (("low", low), ("high", high)):
+            if bound is not None:
+                bound = self._round(bound) if isinstance(bound, Real) else tuple(map(self._round, bound))
+                self.steps.append((kind, bound))
+        return self
+
+    def smooth(self, window: int) -> "TorqueTransform":
+        # Centered moving average; the window shrinks at both ends of the map
+        if window < 1 or window % 2 == 0:
+            raise ValueError("The smoothing window must be a positive odd number of points")
+        self.steps.append(("smooth", window))
+        return self
+
+    def resample(self, points: int) -> "TorqueTransform":
+        # Linear interpolation to a new RPM resolution; first and last point are kept
+        if points < 2:
+            raise ValueError("A resampled torque map needs at least 2 points")
+        self.steps.append(("resample", points))
+        return self
+
+    @staticmethod
+    def _round(value: Real) -> int:
+        return floor(value + 0.5)
+
+    @staticmethod
+    def _pointwise(kind: str, arg) -> bool:
+        return kind in ("scale", "offset") or (kind in ("low", "high") and isinstance(arg, Real))
+
+    def run(self, values) -> Union[list, array]:
+        # Transformed copy of a torque map buffer (list, array or memoryview)
+        compact = not isinstance(values, list)
+        stream, pending = values, []
+        for kind, arg in self.steps:
+            if self._pointwise(kind, arg):
+                pending.append((kind, arg))
+                continue
+            stream = list(self._fuse(stream, pending)) if pending else stream
+            pending = []
+            if kind in ("low", "high"):
+                if len(arg) != len(stream):
+                    raise ValueError(f"Per-point bounds need {len(stream)} values, got {len(arg)}")
+                if kind == "low":
+                    stream = [x if x > bound else bound for x, bound in zip(stream, arg)]
+                else:
+                    stream = [x if x < bound else bound for x, bound in zip(stream, arg)]
+            elif kind == "smooth":
+                stream = self._smooth(stream, arg)
+            else:
+                stream = self._resample(stream, arg)
+        stream = self._fuse(stream, pending) if pending else stream
+        return array("i", stream) if compact else list(stream)
+
+    @classmethod
+    def _fuse(cls, values, steps: list) -> Iterable[int]:
+        if len(values):
+            low, high = min(values), max(values)
+            # The lookup table is indexed by the torque value itself: entries for
+            # 0..high come first and entries for low..-1 are appended after them,
+            # so a negative value v lands on table[len(table) + v], its own entry,
+            # through Python's negative indexing without an extra subtraction.
+            positive, negative = range(max(high + 1, 0)), range(min(low, 0), 0)
+            if len(positive) + len(negative) <= len(values):
+                table = [*cls._chain(positive, steps), *cls._chain(negative, steps)]
+                return map(table.__getitem__, values)
+        return cls._chain(values, steps)
+
+    @staticmethod
+    def _chain(stream: Iterable[int], steps: list) -> Iterable[int]:
+        for kind, arg in steps:
+            if kind == "scale":
+                stream = map(floor, map(add, map(mul, stream, repeat(arg)), repeat(0.5)))
+            elif kind == "offset":
+                stream = map(add, stream, repeat(arg))
+            else:
+                stream = map(max if kind == "low" else min, stream, repeat(arg))
+        return stream
+
+    # smooth() and resample() stay in integer arithmetic and round half up like
+    # _round(): (total + count // 2) // count
+
+    @staticmethod
+    def _smooth(values, window: int) -> list:
+        n, half = len(values), window // 2
+        prefix = [0, *accumulate(values)]
+
+        def edge(i: int) -> int:
+            lo, hi = max(0, i - half), min(n, i + half + 1)
+            return (prefix[hi] - prefix[lo] + (hi - lo) // 2) // (hi - lo)
+
+        if n <= 2 * half:
+            return [edge(i) for i in range(n)]
+        sums = map(sub, prefix[window:], prefix[:n - window + 1])
+        return [*map(edge, range(half)),
+                *map(floordiv, map(add, sums, repeat(half)), repeat(window)),
+                *map(edge, range(n - half, n))]
+
+    @staticmethod
+    def _resample(values, points: int) -> list:
+        # Point j sits at j * (n - 1) / (points - 1) on the old grid: index
+        # position // den, weight position % den / den towards the next point
+        n = len(values)
+        if n < 2:
+            return list(values) * points
+        values = list(values)
+        deltas = list(map(sub, values[1:], values))
+        deltas.append(0)
+        den = points - 1
+        positions = range(0, den * (n - 1) + 1, n - 1)
+        index = list(map(floordiv, positions, repeat(den)))
+        weighted = map(mul, map(deltas.__getitem__, index), map(mod, positions, repeat(den)))
+        steps = map(floordiv, map(add, weighted, repeat(den // 2)), repeat(den))
+        return list(map(add, map(values.__getitem__, index), steps))
+
+    @staticmethod
+    def _storage(torque_map):
+        return torque_map._values if isinstance(torque_map, TorqueMap) else torque_map
+
+    @staticmethod
+    def _store(torque_map, values, shared: bool = False) -> None:
+        # Plain lists are rewritten in place so every alias sees the result
+        if isinstance(torque_map, TorqueMap):
+            torque_map._replace(values, shared)
+        else:
+            torque_map[:] = values
+
+    def apply(self, engine: EngineConfiguration) -> EngineConfiguration:
+        torque_map = engine.torque_map
+        self._store(torque_map, self.run(self._storage(torque_map)))
+        return engine
+
+    def apply_many(self, engines: Iterable[EngineConfiguration]) -> int:
+        # Transforms every configuration in place. Maps that share a buffer
+        # (copy-on-write clones of one prototype) are computed once and keep
+        # sharing the result. Returns the number of buffers actually transformed.
+        groups: dict[int, tuple[object, dict[int, Union[list, TorqueMap]]]] = {}
+        for engine in engines:
+            torque_map = engine.torque_map
+            storage = self._storage(torque_map)
+            groups.setdefault(id(storage), (storage, {}))[1][id(torque_map)] = torque_map
+        for source, torque_maps in groups.values():
+            result = self.run(source)
+            for torque_map in torque_maps.values():
+                self._store(torque_map, result, shared=len(torque_maps) > 1)
+        return len(groups)
+
+class _ReadOnlyTorqueMap(TorqueMap):
+    # Torque map of a variant's resolved engine: writes raise instead of landing
+    # on a throwaway setup
+    __slots__ = ()
+
+    def _read_only(self, *args) -> None:
+        raise TypeError("A variant's torque map is read-only; use set_torque_span() or resolve()")
+
+    __setitem__ = __delitem__ = insert = _replace = _read_only
+
+class _ReadOnlyEngine(EngineConfiguration):
+    # Engine of a variant, resolved on access. Mutating it would silently change
+    # nothing, so every write raises; copies and pickles are plain configurations.
+    __slots__ = ()
+
+    def __init__(self, engine: EngineConfiguration):
+        torque_map = _ReadOnlyTorqueMap.__new__(_ReadOnlyTorqueMap)
+        torque_map._values = TorqueTransform._storage(engine.torque_map)
+        torque_map._shared = True
+        object.__setattr__(self, "mode", engine.mode)
+        object.__setattr__(self, "_torque_map", torque_map)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"A variant's engine is read-only; set {name} on the variant or use resolve()")
+
+    def __reduce__(self):
+        return EngineConfiguration, (self.mode, self._torque_map)
 
 class CarSetup(Prototype):
+    __slots__ = ("front_wing_angle", "tyre_pressure_psi", "engine")
+
     def __init__(self, front_wing_angle: int, tyre_pressure_psi: float, engine: EngineConfiguration):
         self.front_wing_angle = front_wing_angle
         self.tyre_pressure_psi = tyre_pressure_psi
         self.engine = engine
-    
-    def clone(self):
-        return copy.deepcopy(self)
\ No newline at end of file
+
+    def clone(self, copy_on_write: bool = False):
+        if not copy_on_write:
+            return copy.deepcopy(self)
+        twin = copy.copy(self)
+        twin.engine = self.engine.share()
+        return twin
+
+    def clone_many(self, front_wing_angles: Optional[Iterable[int]] = None,
+                   tyre_pressures: Optional[Iterable[float]] = None,
+                   torque_maps: Optional[Iterable[Iterable[int]]] = None) -> "SetupBatch":
+        # Every combination of the given overrides; fields left out keep the prototype value
+        return SetupBatch(self, front_wing_angles, tyre_pressures, torque_maps)
+
+    def derive(self, **changes) -> "SetupVariant":
+        # Delta-encoded variant that only stores the fields that differ from this setup
+        return SetupVariant(self, changes)
+
+class SetupVariant(Prototype):
+    # Delta-encoded clone: a reference to its parent (a CarSetup or another variant)
+    # plus only the changed fields and torque-map spans. Scalar fields are looked up
+    # through the chain; the full setup is resolved on demand and not kept, so a
+    # variant never outgrows its deltas and always reflects its current ancestors.
+    # Edit a variant through its own attributes and set_torque_span(); its engine
+    # is a read-only view.
+    __slots__ = ("parent", "changes", "torque_spans")
+    FIELDS = ("front_wing_angle", "tyre_pressure_psi", "mode")
+
+    def __init__(self, parent: Prototype, changes: Optional[dict] = None, torque_spans: Iterable = ()):
+        changes = dict(changes or {})
+        unknown = set(changes) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Variants can only change {self.FIELDS}, not {sorted(unknown)}")
+        self.parent = parent
+        self.changes = changes
+        self.torque_spans: list[tuple[int, array]] = [(start, array("i", values)) for start, values in torque_spans]
+
+    def _lookup(self, name: str):
+        node = self
+        while isinstance(node, SetupVariant):
+            if name in node.changes:
+                return node.changes[name]
+            node = node.parent
+        return node.engine.mode if name == "mode" else getattr(node, name)
+
+    def _change(self, name: str, value) -> None:
+        self.changes[name] = value
+
+    front_wing_angle = property(lambda self: self._lookup("front_wing_angle"),
+                                lambda self, value: self._change("front_wing_angle", value))
+    tyre_pressure_psi = property(lambda self: self._lookup("tyre_pressure_psi"),
+                                 lambda self, value: self._change("tyre_pressure_psi", value))
+    mode = property(lambda self: self._lookup("mode"),
+                    lambda self, value: self._change("mode", value))
+
+    @property
+    def engine(self) -> EngineConfiguration:
+        # Freshly resolved on every access; keep the result if you read it repeatedly
+        return _ReadOnlyEngine(self.resolve().engine)
+
+    def set_torque_span(self, start: int, values: Iterable[int]) -> None:
+        # Overwrites points [start, start + len(values)); spans never resize the map
+        values = array("i", values)
+        points = len(self._chain()[1].engine.torque_map)
+        if start < 0 or start + len(values) > points:
+            raise IndexError(f"Torque span [{start}, {start + len(values)}) is outside the {points}-point map")
+        self.torque_spans.append((start, values))
+
+    def _chain(self) -> tuple[list["SetupVariant"], CarSetup]:
+        # Variants from this one up to the root, and the root setup itself
+        chain, node = [], self
+        while isinstance(node, SetupVariant):
+            chain.append(node)
+            node = node.parent
+        return chain, node
+
+    @property
+    def depth(self) -> int:
+        return len(self._chain()[0])
+
+    def resolve(self) -> CarSetup:
+        # New setup with every delta applied. It shares the root's torque map
+        # copy-on-write unless some variant in the chain has torque spans.
+        chain, root = self._chain()
+        setup = root.clone(copy_on_write=True)
+        torque_map = setup.engine.torque_map
+        for node in reversed(chain):
+            for name, value in node.changes.items():
+                if name == "mode":
+                    setup.engine.mode = value
+                else:
+                    setattr(setup, name, value)
+            for start, values in node.torque_spans:
+                torque_map[start:start + len(values)] = values
+        return setup
+
+    def compact(self) -> None:
+        # Flattens the chain so this variant points straight at the root setup
+        chain, root = self._chain()
+        changes, spans = {}, []
+        for node in reversed(chain):
+            changes.update(node.changes)
+            spans.extend(node.torque_spans)
+        self.parent, self.changes, self.torque_spans = root, changes, spans
+
+    def derive(self, **changes) -> "SetupVariant":
+        return SetupVariant(self, changes)
+
+    def clone(self) -> "SetupVariant":
+        # A sibling delta on the same parent
+        return SetupVariant(self.parent, self.changes, self.torque_spans)
+
+class SetupBatch:
+    # Column-wise population of setups cloned from one prototype. Each distinct
+    # torque map is stored once as a row of a flat array('i') block, and
+    # CarSetup objects are only materialized on indexing, with the same torque
+    # map storage (list or compact) as the prototype.
+    __slots__ = ("mode", "front_wing_angle", "tyre_pressure_psi",
+                 "torque_map_index", "torque_maps", "points", "compact")
+
+    def __init__(self, prototype: CarSetup,
+                 front_wing_angles: Optional[Iterable[int]] = None,
+                 tyre_pressures: Optional[Iterable[float]] = None,
+                 torque_maps: Optional[Iterable[Iterable[int]]] = None):
+        wings = list(front_wing_angles) if front_wing_angles is not None else [prototype.front_wing_angle]
+        pressures = list(tyre_pressures) if tyre_pressures is not None else [prototype.tyre_pressure_psi]
+        maps = list(torque_maps) if torque_maps is not None else [prototype.engine.torque_map]
+
+        self.mode = prototype.engine.mode
+        self.compact = not isinstance(prototype.engine.torque_map, list)
+        self.points = len(maps[0]) if maps else 0
+        self.torque_maps = array("i")
+        for torque_map in maps:
+            if len(torque_map) != self.points:
+                raise ValueError("All torque maps in a batch must have the same number of points")
+            self.torque_maps.extend(torque_map)
+
+        self.front_wing_angle = self._grid_column("i", wings, len(pressures) * len(maps), 1)
+        self.tyre_pressure_psi = self._grid_column("d", pressures, len(maps), len(wings))
+        self.torque_map_index = self._grid_column("I", range(len(maps)), 1, len(wings) * len(pressures))
+
+    @staticmethod
+    def _grid_column(typecode: str, values: Iterable, inner: int, outer: int) -> array:
+        # Each value repeated `inner` times, the whole block tiled `outer` times
+        column = array(typecode)
+        for value in values:
+            column.extend(array(typecode, (value,)) * inner)
+        return column * outer
+
+    def __len__(self) -> int:
+        return len(self.front_wing_angle)
+
+    def torque_map_row(self, index: int) -> memoryview:
+        # Zero-copy view of the torque map used by candidate `index`
+        start = self.torque_map_index[index] * self.points
+        return memoryview(self.torque_maps)[start:start + self.points]
+
+    def __getitem__(self, index: int) -> CarSetup:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SetupBatch index out of range")
+        start = self.torque_map_index[index] * self.points
+        row = self.torque_maps[start:start + self.points]
+        row = TorqueMap(row, compact=True) if self.compact else row.tolist()
+        engine = EngineConfiguration(self.mode, row)
+        return CarSetup(self.front_wing_angle[index], self.tyre_pressure_psi[index], engine)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
@@ -0,0 +1,247 @@
+from array import array
+from bisect import insort
+from heapq import merge
+from itertools import islice
+from math import hypot
+from operator import itemgetter
+from typing import Iterable, Iterator
+
+from car_setup import CarSetup
+
+# Points are (x, y, insertion order, setup); ordering on (axis, insertion order)
+# makes every split unique, so equal wing angles or pressures never tie
+_BY_X, _BY_Y = itemgetter(0, 2), itemgetter(1, 2)
+_LEAF = 8  # Ranges this small are scanned instead of split
+_CHUNK = 256  # Points a merge handles before handing control back
+_BUFFER = 32  # Newest setups of a mode, scanned linearly until they fill a tree
+
+def _run(steps: Iterator[int]):
+    # Drives a build to completion and returns the finished tree
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+class _StaticKDTree:
+    # Balanced 2-d tree stored implicitly: the node for index range [lo, hi) sits at
+    # (lo + hi) // 2 and splits on x at even depths and on y at odd depths. The
+    # points are also kept sorted by x and by y, so two trees merge without sorting.
+    __slots__ = ("xs", "ys", "points", "by_x", "by_y")
+
+    def __init__(self, points: list, by_x: list, by_y: list):
+        self.points = points
+        self.by_x = by_x
+        self.by_y = by_y
+        self.xs = array("d", (point[0] for point in points))
+        self.ys = array("d", (point[1] for point in points))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @classmethod
+    def from_points(cls, points: list) -> "_StaticKDTree":
+        return _run(cls._build(sorted(points, key=_BY_X), sorted(points, key=_BY_Y)))
+
+    @classmethod
+    def merged(cls, first: "_StaticKDTree", second: "_StaticKDTree") -> Iterator[int]:
+        # Yields the number of points handled after every chunk and returns the
+        # merged tree, so the merge can be spread over many inserts
+        by_x, by_y = [], []
+        for ordered, sources, key in ((by_x, (first.by_x, second.by_x), _BY_X),
+                                      (by_y, (first.by_y, second.by_y), _BY_Y)):
+            merged = merge(*sources, key=key)
+            while chunk := list(islice(merged, _CHUNK)):
+                ordered += chunk
+                yield len(chunk)
+        return (yield from cls._build(by_x, by_y))
+
+    @classmethod
+    def _build(cls, by_x: list, by_y: list) -> Iterator[int]:
+        # Works on x ranks: an x split is a plain rank comparison and a y split
+        # looks up the y rank. Each node takes the median of its range in split-axis
+        # order, then splits the other order around it, so both children arrive
+        # sorted both ways.
+        size = len(by_x)
+        x_rank: dict[int, int] = {}
+        for start in range(0, size, _CHUNK):
+            x_rank.update((point[2], rank) for rank, point in enumerate(by_x[start:start + _CHUNK], start))
+            yield min(_CHUNK, size - start)
+        y_order: list[int] = []
+        y_rank = [0] * size
+        for start in range(0, size, _CHUNK):
+            chunk = [x_rank[point[2]] for point in by_y[start:start + _CHUNK]]
+            for rank, point in enumerate(chunk, start):
+                y_rank[point] = rank
+            y_order += chunk
+            yield len(chunk)
+
+        arranged = [0] * size
+        pending = [(0, range(size), y_order, 0)]
+        while pending:
+            lo, primary, secondary, axis = pending.pop()
+            count = len(primary)
+            if count <= _LEAF:
+                arranged[lo:lo + count] = primary
+                continue
+            mid = count // 2
+            median = primary[mid]
+            arranged[lo + mid] = median
+            below, above = [], []
+            if axis == 0:
+                for start in range(0, count, _CHUNK):
+                    chunk = secondary[start:start + _CHUNK]
+                    below += [point for point in chunk if point < median]
+                    above += [point for point in chunk if point > median]
+                    yield len(chunk)
+            else:
+                split = y_rank[median]
+                for start in range(0, count, _CHUNK):
+                    chunk = secondary[start:start + _CHUNK]
+                    below += [point for point in chunk if y_rank[point] < split]
+                    above += [point for point in chunk if y_rank[point] > split]
+                    yield len(chunk)
+            pending.append((lo, below, primary[:mid], 1 - axis))
+            pending.append((lo + mid + 1, above, primary[mid + 1:], 1 - axis))
+
+        points: list = []
+        for start in range(0, size, _CHUNK):
+            points += [by_x[rank] for rank in arranged[start:start + _CHUNK]]
+            yield min(_CHUNK, size - start)
+        return cls(points, by_x, by_y)
+
+    @staticmethod
+    def work(size: int) -> int:
+        # Points a merge into `size` points handles: two ordered merges, two rank
+        # passes, one pass per tree level above the leaves and the final gather
+        return size * (max(size // _LEAF, 1).bit_length() + 5)
+
+    def search(self, qx: float, qy: float, k: int, best: list) -> None:
+        xs, ys, points = self.xs, self.ys, self.points
+
+        def visit(lo: int, hi: int, axis: int) -> None:
+            if hi - lo <= _LEAF:
+                for index in range(lo, hi):
+                    candidate = (hypot(xs[index] - qx, ys[index] - qy), points[index][2])
+                    if len(best) < k or candidate < best[-1][:2]:
+                        insort(best, (*candidate, points[index][3]))
+                        del best[k:]
+                return
+            mid = (lo + hi) // 2
+            candidate = (hypot(xs[mid] - qx, ys[mid] - qy), points[mid][2])
+            if len(best) < k or candidate < best[-1][:2]:
+                insort(best, (*candidate, points[mid][3]))
+                del best[k:]
+            diff = (qx - xs[mid]) if axis == 0 else (qy - ys[mid])
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            visit(*near, 1 - axis)
+            if len(best) < k or abs(diff) <= best[-1][0]:
+                visit(*far, 1 - axis)
+
+        visit(0, len(points), 0)
+
+class _Partition:
+    # The setups of one engine mode: a short buffer of the newest setups plus
+    # levels of static trees, where level i holds trees of up to _BUFFER << i setups.
+    # Two trees on the same level are merged into the next level a few chunks at a
+    # time, on the inserts that follow; both stay searchable until the merge is done.
+    __slots__ = ("buffer", "levels", "merges")
+
+    def __init__(self):
+        self.buffer: list = []
+        self.levels: list[list[_StaticKDTree]] = []
+        self.merges: dict[int, tuple[Iterator[int], int]] = {}  # level -> (steps, points per insert)
+
+    def add(self, points: list) -> None:
+        # Costs O(len(points) log n) for the new points plus a bounded share of
+        # every merge in progress
+        buffer = self.buffer
+        buffer += points
+        if len(buffer) >= _BUFFER:
+            self._place(_StaticKDTree.from_points(buffer))
+            self.buffer = []
+        self._advance(len(points))
+
+    def _place(self, tree: _StaticKDTree) -> None:
+        level = ((len(tree) - 1) // _BUFFER).bit_length()
+        while len(self.levels) <= level:
+            self.levels.append([])
+        self.levels[level].append(tree)
+        self._schedule(level)
+
+    def _schedule(self, level: int) -> None:
+        trees = self.levels[level]
+        if level in self.merges or len(trees) < 2:
+            return
+        first, second = trees[:2]
+        # A new tree reaches this level about every _BUFFER << level inserts; doing
+        # twice the needed share per insert finishes the merge well before that
+        share = -(-2 * _StaticKDTree.work(len(first) + len(second)) // (_BUFFER << level))
+        self.merges[level] = (_StaticKDTree.merged(first, second), share)
+
+    def _advance(self, inserted: int) -> None:
+        for level, (steps, share) in list(self.merges.items()):
+            budget = share * inserted
+            try:
+                while budget > 0:
+                    budget -= next(steps)
+            except StopIteration as done:
+                del self.merges[level]
+                del self.levels[level][:2]
+                self._place(done.value)
+                self._schedule(level)
+
+    def search(self, qx: float, qy: float, k: int, best: list) -> None:
+        for x, y, order, setup in self.buffer:
+            candidate = (hypot(x - qx, y - qy), order)
+            if len(best) < k or candidate < best[-1][:2]:
+                insort(best, (*candidate, setup))
+                del best[k:]
+        # Largest trees first, so the shared bound tightens early
+        for trees in reversed(self.levels):
+            for tree in trees:
+                tree.search(qx, qy, k, best)
+
+class SetupIndex:
+    # Nearest-neighbour index over CarSetup prototypes, partitioned by engine mode.
+    # Distances are Euclidean after dividing each field by `scale`, so the default
+    # treats 1 degree of wing like 0.25 psi of tyre pressure. Each partition keeps
+    # its newest setups in a small linear-scan buffer and the rest in balanced static
+    # k-d trees of doubling sizes, merged incrementally: no single insert rebuilds
+    # more than a bounded slice of the index. A query searches the buffer and every
+    # tree with one shared k-best list.
+    def __init__(self, scale: tuple[float, float] = (1.0, 0.25)):
+        self.scale = scale
+        self._partitions: dict[str, _Partition] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _scaled(self, front_wing_angle: float, tyre_pressure_psi: float) -> tuple[float, float]:
+        return front_wing_angle / self.scale[0], tyre_pressure_psi / self.scale[1]
+
+    def insert(self, setup: CarSetup) -> None:
+        self.extend((setup,))
+
+    def extend(self, setups: Iterable[CarSetup]) -> None:
+        batches: dict[str, list[tuple[float, float, int, CarSetup]]] = {}
+        for setup in setups:
+            x, y = self._scaled(setup.front_wing_angle, setup.tyre_pressure_psi)
+            batches.setdefault(setup.engine.mode, []).append((x, y, self._count, setup))
+            self._count += 1
+        for mode, batch in batches.items():
+            partition = self._partitions.get(mode)
+            if partition is None:
+                partition = self._partitions[mode] = _Partition()
+            partition.add(batch)
+
+    def nearest(self, front_wing_angle: float, tyre_pressure_psi: float, mode: str, k: int = 1) -> list[CarSetup]:
+        # The k closest stored setups of `mode`, closest first; ties go to the earlier insert
+        partition = self._partitions.get(mode)
+        if k < 1 or partition is None:
+            return []
+        qx, qy = self._scaled(front_wing_angle, tyre_pressure_psi)
+        best: list[tuple[float, int, CarSetup]] = []
+        partition.search(qx, qy, k, best)
+        return [setup for _, _, setup in best]
@@ -0,0 +1,118 @@
+from array import array
+from typing import BinaryIO, Iterable
+import mmap
+import struct
+import sys
+
+from car_setup import CarSetup, EngineConfiguration, TorqueMap
+
+# File layout (native byte order, recorded in the header; every section 8-byte aligned):
+#   header | wing int32[n] | pressure float64[n] | mode index uint16[n]
+#   | torque map offsets uint64[n + 1] | mode string table | torque map blob int32[...]
+MAGIC = b"F1SETUP1"
+_HEADER = struct.Struct("=8sc3xII4x6Q")
+_BYTE_ORDER = b"<" if sys.byteorder == "little" else b">"
+
+def _pad(out: BinaryIO, position: int) -> int:
+    padding = -position % 8
+    out.write(bytes(padding))
+    return position + padding
+
+def save_setups(setups: Iterable[CarSetup], path: str) -> int:
+    # Writes a columnar setup library; returns the number of setups written
+    setups = list(setups)
+    modes: dict[str, int] = {}
+    wings, pressures, mode_index = array("i"), array("d"), array("H")
+    offsets, blob = array("Q", [0]), array("i")
+    for setup in setups:
+        wings.append(setup.front_wing_angle)
+        pressures.append(setup.tyre_pressure_psi)
+        mode_index.append(modes.setdefault(setup.engine.mode, len(modes)))
+        blob.extend(setup.engine.torque_map)
+        offsets.append(len(blob))
+
+    strings = bytearray()
+    for mode in modes:
+        encoded = mode.encode("utf-8")
+        strings += struct.pack("=I", len(encoded)) + encoded
+
+    with open(path, "wb") as out:
+        out.write(bytes(_HEADER.size))
+        position = _HEADER.size
+        section_offsets = []
+        for section in (wings, pressures, mode_index, offsets, strings, blob):
+            position = _pad(out, position)
+            section_offsets.append(position)
+            data = section if isinstance(section, bytearray) else section.tobytes()
+            out.write(data)
+            position += len(data)
+        out.seek(0)
+        out.write(_HEADER.pack(MAGIC, _BYTE_ORDER, len(setups), len(modes), *section_offsets))
+    return len(setups)
+
+class SetupLibrary:
+    # Read-only, memory-mapped setup library. Opening it only parses the header and
+    # the mode table; setups are materialized by index, and their torque maps are
+    # zero-copy views into the mapping until they are written to.
+    def __init__(self, path: str):
+        with open(path, "rb") as source:
+            self._mmap = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        try:
+            magic, byte_order, count, mode_count, *sections = _HEADER.unpack_from(buffer)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a setup library")
+            if byte_order != _BYTE_ORDER:
+                raise ValueError(f"{path} was written on a host with a different byte order")
+        except BaseException:
+            # Nothing else holds the mapping yet, so a rejected file is unmapped here
+            buffer.release()
+            self._mmap.close()
+            raise
+        wing_at, pressure_at, mode_at, offsets_at, strings_at, blob_at = sections
+
+        self._count = count
+        self.front_wing_angle = buffer[wing_at:wing_at + 4 * count].cast("i")
+        self.tyre_pressure_psi = buffer[pressure_at:pressure_at + 8 * count].cast("d")
+        self.mode_index = buffer[mode_at:mode_at + 2 * count].cast("H")
+        self._offsets = buffer[offsets_at:offsets_at + 8 * (count + 1)].cast("Q")
+        self._blob = buffer[blob_at:blob_at + 4 * self._offsets[count]].cast("i")
+        self.modes = []
+        position = strings_at
+        for _ in range(mode_count):
+            (length,) = struct.unpack_from("=I", buffer, position)
+            self.modes.append(bytes(buffer[position + 4:position + 4 + length]).decode("utf-8"))
+            position += 4 + length
+        self._views = [buffer, self.front_wing_angle, self.tyre_pressure_psi,
+                       self.mode_index, self._offsets, self._blob]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def torque_map_view(self, index: int) -> memoryview:
+        return self._blob[self._offsets[index]:self._offsets[index + 1]]
+
+    def __getitem__(self, index: int) -> CarSetup:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("SetupLibrary index out of range")
+        engine = EngineConfiguration(self.modes[self.mode_index[index]],
+                                     TorqueMap.from_buffer(self.torque_map_view(index)))
+        return CarSetup(self.front_wing_angle[index], self.tyre_pressure_psi[index], engine)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def close(self) -> None:
+        # Raises BufferError while materialized setups still view unwritten torque maps
+        for view in reversed(self._views):
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "SetupLibrary":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterator
+import copy
+import threading
+
+from car_setup import CarSetup, EngineConfiguration, Prototype, TorqueMap
+
+# Specialized copiers by exact class. Each one rebuilds its object field by field,
+# which skips deepcopy's memo dict and its generic __reduce_ex__ dispatch.
+# Classes without a registered copier (including subclasses) fall back to deepcopy.
+_COPIERS: dict[type, Callable] = {}
+
+def register_copier(cls: type, copier: Callable) -> None:
+    _COPIERS[cls] = copier
+
+def copier_for(cls: type) -> Callable:
+    return _COPIERS.get(cls, copy.deepcopy)
+
+# Nested fields are copied with the copier of their own class; the lookups are
+# bound as defaults because they run on every clone
+def _copy_engine(engine: EngineConfiguration, _copiers=_COPIERS, _fallback=copy.deepcopy) -> EngineConfiguration:
+    torque_map = engine._torque_map
+    twin = EngineConfiguration.__new__(EngineConfiguration)
+    twin.mode = engine.mode
+    twin._torque_map = _copiers.get(type(torque_map), _fallback)(torque_map)
+    return twin
+
+def _copy_setup(setup: CarSetup, _copiers=_COPIERS, _fallback=copy.deepcopy) -> CarSetup:
+    engine = setup.engine
+    twin = CarSetup.__new__(CarSetup)
+    twin.front_wing_angle = setup.front_wing_angle
+    twin.tyre_pressure_psi = setup.tyre_pressure_psi
+    twin.engine = _copiers.get(type(engine), _fallback)(engine)
+    return twin
+
+# TorqueMap already copies each of its storages without needing a memo
+register_copier(TorqueMap, TorqueMap.__deepcopy__)
+# Plain torque maps are lists of ints, so a shallow copy is already a deep one
+register_copier(list, list.copy)
+register_copier(EngineConfiguration, _copy_engine)
+register_copier(CarSetup, _copy_setup)
+
+class SetupRegistry:
+    # Baseline setups keyed by (circuit, session, mode). Templates are pre-warmed
+    # on registration: variants are resolved, the setup is copied into memory the
+    # registry owns, and its copier is looked up once. get_clone() then costs a
+    # lookup and an O(1) move to the recent end under the lock, plus one
+    # specialized copy outside it. At most `max_templates` are kept; the least
+    # recently used template is evicted first, in O(1).
+    def __init__(self, max_templates: int = 256):
+        if max_templates < 1:
+            raise ValueError("A registry must hold at least one template")
+        self.max_templates = max_templates
+        # Least recently used first
+        self._templates: OrderedDict[tuple, tuple[Callable, CarSetup]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, circuit: Hashable, session: Hashable, setup: Prototype) -> tuple:
+        # Returns the key, whose mode is taken from the setup's engine
+        if hasattr(setup, "resolve"):
+            setup = setup.resolve()
+        copier = copier_for(type(setup))
+        template = copier(setup)
+        key = (circuit, session, template.engine.mode)
+        with self._lock:
+            self._templates[key] = (copier, template)
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_templates:
+                self._templates.popitem(last=False)
+        return key
+
+    def get_clone(self, key: tuple) -> CarSetup:
+        # Raises KeyError for unknown or evicted keys. Templates are never modified
+        # after registration, so the copy itself runs outside the lock. An explicit
+        # acquire/release is noticeably cheaper than `with` on this hot path.
+        lock = self._lock
+        lock.acquire()
+        try:
+            copier, template = self._templates[key]
+            self._templates.move_to_end(key)
+        finally:
+            lock.release()
+        return copier(template)
+
+    def unregister(self, key: tuple) -> None:
+        with self._lock:
+            del self._templates[key]
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._templates
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def keys(self) -> Iterator[tuple]:
+        with self._lock:
+            return iter(list(self._templates))
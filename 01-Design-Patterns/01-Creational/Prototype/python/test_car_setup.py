@@ -1,6 +1,9 @@
 from abc import ABC
+from array import array
+import copy
+import math
 import pytest
-from car_setup import CarSetup, EngineConfiguration, Prototype
+from car_setup import CarSetup, EngineConfiguration, Prototype, SetupBatch, TorqueTransform
 
 def test_cloning_creates_new_object_reference():
     """
@@ -68,3 +71,495 @@ def test_interface_enforcement():
         _ = Prototype()
 
     assert getattr(Prototype.clone, '__isabstractmethod__', False), "The 'clone' method must be decorated with @abstractmethod!"
+
+def test_copy_on_write_clone_isolation():
+    """
+    TEST 5: Copy-on-Write Isolation
+    A copy-on-write clone must give the same isolation guarantees as the
+    deep copy, in both directions.
+    """
+    engine = EngineConfiguration(mode="Qualifying", torque_map=[500, 600])
+    original = CarSetup(front_wing_angle=6, tyre_pressure_psi=22.5, engine=engine)
+
+    clone = original.clone(copy_on_write=True)
+    clone.engine.mode = "Save"
+    clone.engine.torque_map[0] = 100
+
+    assert original.engine.mode == "Qualifying"
+    assert original.engine.torque_map == [500, 600]
+    assert clone.engine.torque_map == [100, 600]
+
+    # Writes through the original must not leak into a fresh clone either
+    second = original.clone(copy_on_write=True)
+    original.engine.torque_map.append(700)
+
+    assert second.engine.torque_map == [500, 600]
+    assert original.engine.torque_map == [500, 600, 700]
+
+def test_copy_on_write_shares_until_written():
+    """
+    TEST 6: Structural Sharing
+    Clones share the torque map buffer until one of them writes to it.
+    """
+    engine = EngineConfiguration(mode="Race", torque_map=[1, 2, 3])
+    original = CarSetup(front_wing_angle=5, tyre_pressure_psi=20.0, engine=engine)
+
+    clone = original.clone(copy_on_write=True)
+    assert clone.engine is not original.engine
+    assert clone.engine.torque_map._values is original.engine.torque_map._values
+
+    clone.front_wing_angle = 8
+    assert clone.engine.torque_map._values is original.engine.torque_map._values
+
+    clone.engine.torque_map[1] = 20
+    assert clone.engine.torque_map._values is not original.engine.torque_map._values
+    assert original.front_wing_angle == 5
+
+def test_copy_on_write_memory():
+    """
+    TEST 7: Copy-on-Write Memory
+    Copy-on-write clones of a high-resolution torque map take a small fraction
+    of the memory of deep copies. Speed is checked by `benchmarks.py targets`.
+    """
+    import tracemalloc
+
+    engine = EngineConfiguration(mode="Race", torque_map=list(range(20_000)))
+    baseline = CarSetup(front_wing_angle=4, tyre_pressure_psi=21.0, engine=engine)
+    baseline.clone(copy_on_write=True)
+    peak_per_clone = {}
+
+    for copy_on_write, clones in ((False, 50), (True, 5_000)):
+        tracemalloc.start()
+        population = [baseline.clone(copy_on_write=copy_on_write) for _ in range(clones)]
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_per_clone[copy_on_write] = peak / clones
+        del population
+
+    assert peak_per_clone[True] * 100 < peak_per_clone[False]
+
+def test_compact_torque_map_is_list_like():
+    """
+    TEST 8: Compact Torque Map
+    An array-backed torque map must still behave like the list callers expect.
+    """
+    engine = EngineConfiguration(mode="Race", torque_map=[100, 200, 300], compact=True)
+
+    assert engine.torque_map.compact
+    assert engine.torque_map == [100, 200, 300]
+    assert engine.torque_map[-1] == 300
+    assert engine.torque_map[0:2] == [100, 200]
+    assert len(engine.torque_map) == 3
+
+    engine.torque_map[0:2] = [110, 210]
+    engine.torque_map.append(400)
+    assert list(engine.torque_map) == [110, 210, 300, 400]
+
+    # Passing an array opts in without the flag
+    assert EngineConfiguration(mode="Race", torque_map=array("i", [1, 2])).torque_map.compact
+
+def test_compact_clone_isolation():
+    """
+    TEST 9: Compact Deep Copy Isolation
+    Cloning a setup with a compact torque map keeps the buffer type and isolation.
+    """
+    engine = EngineConfiguration(mode="Qualifying", torque_map=[500, 600], compact=True)
+    original = CarSetup(front_wing_angle=6, tyre_pressure_psi=22.5, engine=engine)
+
+    for clone in (original.clone(), original.clone(copy_on_write=True)):
+        clone.engine.torque_map[0] = 100
+        assert clone.engine.torque_map.compact
+        assert original.engine.torque_map == [500, 600]
+
+def test_slotted_setup_objects():
+    """
+    TEST 10: Slotted Representation
+    CarSetup and EngineConfiguration must not carry a per-instance __dict__.
+    """
+    engine = EngineConfiguration(mode="Race", torque_map=[1, 2])
+    setup = CarSetup(front_wing_angle=5, tyre_pressure_psi=20.0, engine=engine)
+
+    assert not hasattr(engine, "__dict__")
+    assert not hasattr(setup, "__dict__")
+    with pytest.raises(AttributeError):
+        setup.rear_wing_angle = 3
+
+def test_compact_torque_map_memory():
+    """
+    TEST 11: Memory Footprint
+    A compact 20k-point map must be an order of magnitude smaller than the list.
+    """
+    import tracemalloc
+
+    points = range(1_000, 21_000)
+    footprint = {}
+    for compact in (False, True):
+        tracemalloc.start()
+        engine = EngineConfiguration(mode="Race", torque_map=points, compact=compact)
+        footprint[compact], _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del engine
+
+    assert footprint[True] * 8 < footprint[False]
+
+def test_clone_many_builds_grid():
+    """
+    TEST 12: Batched Construction
+    clone_many must produce every combination of the overrides, column-wise.
+    """
+    engine = EngineConfiguration(mode="Race", torque_map=[100, 200])
+    prototype = CarSetup(front_wing_angle=4, tyre_pressure_psi=21.0, engine=engine)
+
+    batch = prototype.clone_many(front_wing_angles=[3, 4, 5],
+                                 tyre_pressures=[20.5, 21.5],
+                                 torque_maps=[[100, 200], [110, 220]])
+
+    assert isinstance(batch, SetupBatch)
+    assert len(batch) == 12
+    assert list(batch.front_wing_angle[:4]) == [3, 3, 3, 3]
+    assert list(batch.tyre_pressure_psi[:4]) == [20.5, 20.5, 21.5, 21.5]
+    assert list(batch.torque_map_index[:4]) == [0, 1, 0, 1]
+    assert batch.torque_map_row(1).tolist() == [110, 220]
+
+    last = batch[-1]
+    assert isinstance(last, CarSetup)
+    assert (last.front_wing_angle, last.tyre_pressure_psi) == (5, 21.5)
+    assert last.engine.mode == "Race"
+    assert last.engine.torque_map == [110, 220]
+
+def test_clone_many_defaults_and_isolation():
+    """
+    TEST 13: Batch Defaults and Isolation
+    Fields without overrides keep the prototype value, and materialized
+    setups must not write back into the batch or the prototype.
+    """
+    engine = EngineConfiguration(mode="Qualifying", torque_map=[500, 600])
+    prototype = CarSetup(front_wing_angle=6, tyre_pressure_psi=22.5, engine=engine)
+
+    batch = prototype.clone_many(tyre_pressures=[22.0, 23.0])
+    assert [setup.front_wing_angle for setup in batch] == [6, 6]
+
+    candidate = batch[0]
+    assert isinstance(candidate.engine.torque_map, list)
+    assert candidate.engine.torque_map[:1] == [500]
+    candidate.engine.torque_map[0] = 1
+    assert batch[0].engine.torque_map == [500, 600]
+    assert prototype.engine.torque_map == [500, 600]
+
+    with pytest.raises(IndexError):
+        batch[2]
+    with pytest.raises(ValueError):
+        prototype.clone_many(torque_maps=[[1, 2], [1, 2, 3]])
+
+def test_clone_many_matches_clone_loop():
+    """
+    TEST 14: Batch vs Clone Loop
+    Builds a 50 x 40 x 5 candidate grid column-wise and with a Python loop of
+    clone() plus attribute writes; both give the same candidates. The speedup
+    is checked by `benchmarks.py targets`.
+    """
+    maps = [[base + rpm for rpm in range(200)] for base in range(0, 500, 100)]
+    engine = EngineConfiguration(mode="Race", torque_map=maps[0])
+    prototype = CarSetup(front_wing_angle=4, tyre_pressure_psi=21.0, engine=engine)
+    wings, pressures = range(50), [19.0 + 0.1 * step for step in range(40)]
+
+    population = []
+    for wing in wings:
+        for pressure in pressures:
+            for torque_map in maps:
+                setup = prototype.clone(copy_on_write=True)
+                setup.front_wing_angle = wing
+                setup.tyre_pressure_psi = pressure
+                setup.engine.torque_map = torque_map
+                population.append(setup)
+
+    batch = prototype.clone_many(wings, pressures, maps)
+    assert len(batch) == len(population) == 10_000
+    for index in (0, 4_321, 9_999):
+        setup, expected = batch[index], population[index]
+        assert (setup.front_wing_angle, setup.tyre_pressure_psi) == (expected.front_wing_angle, expected.tyre_pressure_psi)
+        assert setup.engine.torque_map == expected.engine.torque_map
+
+def test_delta_variant_transparent_access():
+    """
+    TEST 15: Delta-Encoded Variants
+    A variant stores only what changed but reads like a full setup, and
+    its edits never touch the parent prototype.
+    """
+    engine = EngineConfiguration(mode="Race", torque_map=[100, 200, 300, 400])
+    baseline = CarSetup(front_wing_angle=4, tyre_pressure_psi=21.0, engine=engine)
+
+    variant = baseline.derive(front_wing_angle=6)
+    variant.set_torque_span(1, [210, 310])
+
+    assert isinstance(variant, Prototype)
+    assert variant.changes == {"front_wing_angle": 6}
+    assert (variant.front_wing_angle, variant.tyre_pressure_psi, variant.mode) == (6, 21.0, "Race")
+    assert variant.engine.torque_map == [100, 210, 310, 400]
+    assert baseline.engine.torque_map == [100, 200, 300, 400]
+
+    resolved = variant.resolve()
+    resolved.engine.torque_map[0] = 1
+    assert variant.engine.torque_map[0] == 100
+
+    variant.tyre_pressure_psi = 22.0
+    assert variant.resolve().tyre_pressure_psi == 22.0
+    assert baseline.tyre_pressure_psi == 21.0
+
+    with pytest.raises(ValueError):
+        baseline.derive(rear_wing_angle=3)
+
+def test_delta_chain_compaction():
+    """
+    TEST 16: Chain Compaction
+    Flattening a long chain keeps the resolved setup and points straight at the root.
+    """
+    engine = EngineConfiguration(mode="Race", torque_map=[0] * 6)
+    baseline = CarSetup(front_wing_angle=4, tyre_pressure_psi=21.0, engine=engine)
+
+    variant = baseline.derive(mode="Qualifying")
+    for step in range(1, 6):
+        variant = variant.derive(front_wing_angle=4 + step)
+        variant.set_torque_span(step, [step])
+    expected = variant.resolve()
+    assert variant.depth == 6
+
+    variant.compact()
+
+    assert variant.depth == 1
+    assert variant.parent is baseline
+    assert variant.changes == {"mode": "Qualifying", "front_wing_angle": 9}
+    assert variant.engine.torque_map == expected.engine.torque_map == [0, 1, 2, 3, 4, 5]
+    assert variant.clone().engine.mode == "Qualifying"
+
+def test_delta_library_memory():
+    """
+    TEST 17: Library Footprint
+    A library of one- or two-field variants of a baseline, some with a torque
+    span, is at least 10x smaller than the same library of deep-copied clones,
+    even after every variant's engine has been read.
+    """
+    import tracemalloc
+
+    engine = EngineConfiguration(mode="Race", torque_map=list(range(1_000, 3_000)))
+    baseline = CarSetup(front_wing_angle=4, tyre_pressure_psi=21.0, engine=engine)
+    footprint = {}
+
+    tracemalloc.start()
+    clones = []
+    for step in range(500):
+        clone = baseline.clone()
+        clone.front_wing_angle = step
+        clones.append(clone)
+    footprint["clones"], _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del clones
+
+    tracemalloc.start()
+    variants = [baseline.derive(front_wing_angle=step) for step in range(500)]
+    for variant in variants[::5]:
+        variant.set_torque_span(10, [0, 0, 0])
+    for variant in variants:
+        assert len(variant.engine.torque_map) == 2_000
+    footprint["variants"], _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert variants[42].front_wing_angle == 42
+    assert footprint["variants"] * 10 < footprint["clones"]
+
+def test_torque_map_transforms():
+    """
+    TEST 18: Torque-Map Transforms
+    scale, offset, clamp (scalar or per RPM band), smooth and resample rewrite
+    the torque map in place, round to whole Nm and keep list or compact storage.
+    """
+    engine = EngineConfiguration(mode="Race", torque_map=[100, 200, 300, 400, 500])
+    torque_map = engine.torque_map
+    assert engine.scale(1.05) is engine
+    assert engine.torque_map is torque_map
+    assert torque_map == [105, 210, 315, 420, 525]
+    assert engine.offset(-5).clamp(low=110, high=[150, 300, 300, 400, 600]).torque_map == [110, 205, 300, 400, 520]
+    assert isinstance(torque_map, list)
+
+    compact = EngineConfiguration(mode="Race", torque_map=[1, 2, 3, 4, 5, 6], compact=True)
+    assert compact.smooth(3).torque_map == [2, 2, 3, 4, 5, 6]
+    assert compact.torque_map.compact
+    assert compact.resample(11).torque_map == [2, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6]
+
+    # Wide value ranges skip the lookup table and give the same result
+    wide = list(range(-50_000, 50_000, 997))
+    quali = TorqueTransform().scale(1.05).offset(3).clamp(-40_000, 40_000)
+    assert quali.run(wide) == [min(max(math.floor(v * 1.05 + 0.5) + 3, -40_000), 40_000) for v in wide]
+    assert quali.run(wide[:3] * 40) == quali.run(wide[:3]) * 40
+
+    # Every step rounds halves up, including negative ones
+    assert TorqueTransform().scale(0.5).run([1, 3, 5, -1, -3]) == [1, 2, 3, 0, -1]
+    assert TorqueTransform().scale(0.5).run(list(range(-5, 6)) * 3)[:11] == [-2, -2, -1, -1, 0, 0, 1, 1, 2, 2, 3]
+    assert TorqueTransform().smooth(3).run([0, 1, -1, -2]) == [1, 0, -1, -1]
+    assert TorqueTransform().resample(3).run([0, 1]) == [0, 1, 1]
+    assert TorqueTransform().offset(2.5).clamp(low=-0.5).run([-10, 10]) == [0, 13]
+
+    with pytest.raises(ValueError):
+        engine.clamp(high=[1, 2])
+    with pytest.raises(ValueError):
+        TorqueTransform().smooth(4)
+    with pytest.raises(ValueError):
+        TorqueTransform().resample(1)
+
+def test_batched_transforms_share_results():
+    """
+    TEST 19: Batched Transforms
+    apply_many() transforms every configuration in place, but computes maps that
+    share a copy-on-write buffer only once. The prototype is left untouched.
+    """
+    prototype = CarSetup(4, 21.0, EngineConfiguration(mode="Race", torque_map=[400, 500, 600], compact=True))
+    clones = [prototype.clone(copy_on_write=True) for _ in range(3)]
+    other = CarSetup(4, 21.0, EngineConfiguration(mode="Race", torque_map=[100, 100, 100]))
+
+    quali = TorqueTransform().scale(1.1).clamp(high=[450, 700, 650])
+    computed = quali.apply_many([setup.engine for setup in clones] + [other.engine])
+
+    assert computed == 2
+    assert prototype.engine.torque_map == [400, 500, 600]
+    assert all(setup.engine.torque_map == [440, 550, 650] for setup in clones)
+    assert other.engine.torque_map == [110, 110, 110]
+
+    clones[0].engine.torque_map[0] = 0
+    assert clones[1].engine.torque_map[0] == 440
+
+def test_transform_shared_and_distinct_maps():
+    """
+    TEST 20: Shared and Distinct Maps
+    Deriving quali maps (x1.05, capped per RPM band) from 20k-point race maps.
+    10k copy-on-write clones of one map are transformed once and keep sharing
+    the result; distinct maps match a per-map list comprehension. Speed is
+    checked by `benchmarks.py targets`.
+    """
+    import random
+
+    random.seed(7)
+    points = 20_000
+    caps = [880] * points
+    quali = TorqueTransform().scale(1.05).clamp(high=caps)
+    prototype = CarSetup(4, 21.0, EngineConfiguration(
+        mode="Race", torque_map=[random.randrange(300, 900) for _ in range(points)], compact=True))
+
+    shared = [prototype.clone(copy_on_write=True).engine for _ in range(10_000)]
+    assert quali.apply_many(shared) == 1
+
+    race_maps = [[random.randrange(300, 900) for _ in range(points)] for _ in range(20)]
+    engines = [EngineConfiguration(mode="Race", torque_map=race_map) for race_map in race_maps]
+    expected = [[min(math.floor(torque * 1.05 + 0.5), cap) for torque, cap in zip(race_map, caps)]
+                for race_map in race_maps]
+    assert quali.apply_many(engines) == 20
+
+    assert all(engine.torque_map._values is shared[0].torque_map._values for engine in shared)
+    assert shared[0].torque_map == [min(math.floor(torque * 1.05 + 0.5), 880) for torque in prototype.engine.torque_map]
+    assert [engine.torque_map for engine in engines] == expected
+    assert race_maps == expected
+
+def test_torque_map_shallow_copy_and_tolist():
+    """
+    TEST 21: Shallow Copies and Plain Lists
+    copy.copy() of a torque map is independent of the original, and tolist()
+    returns a real list that json can serialize.
+    """
+    import json
+
+    engine = EngineConfiguration(mode="Race", torque_map=[100, 200, 300])
+    twin = copy.copy(engine.share().torque_map)
+    twin[0] = 999
+    assert engine.torque_map == [100, 200, 300]
+    assert twin == [999, 200, 300]
+
+    compact = EngineConfiguration(mode="Race", torque_map=[1, 2], compact=True)
+    assert compact.torque_map.tolist() == [1, 2]
+    assert type(compact.torque_map.tolist()) is list
+    assert json.dumps(engine.torque_map.tolist()) == "[100, 200, 300]"
+
+def test_variants_follow_ancestor_changes():
+    """
+    TEST 22: Live Ancestors
+    Resolving a variant always reflects its ancestors' current deltas, even after
+    it has been resolved before.
+    """
+    engine = EngineConfiguration(mode="Race", torque_map=[100, 200, 300])
+    baseline = CarSetup(front_wing_angle=4, tyre_pressure_psi=21.0, engine=engine)
+    parent = baseline.derive(front_wing_angle=6)
+    child = parent.derive(tyre_pressure_psi=22.0)
+    assert child.resolve().front_wing_angle == 6
+
+    parent.front_wing_angle = 9
+    parent.set_torque_span(0, [150])
+
+    assert child.front_wing_angle == 9
+    assert child.resolve().front_wing_angle == 9
+    assert child.engine.torque_map == [150, 200, 300]
+    assert not hasattr(child, "_resolved")
+
+def test_plain_torque_maps_stay_lists():
+    """
+    TEST 23: Plain Lists Stay Lists
+    A list assigned as the torque map is stored as is: it keeps its aliasing and
+    every list operation. Only copy-on-write sharing turns it into a TorqueMap.
+    """
+    torque_map = [300, 100, 200]
+    engine = EngineConfiguration(mode="Race", torque_map=torque_map)
+    assert engine.torque_map is torque_map
+    assert isinstance(engine.torque_map, list)
+
+    torque_map.append(400)
+    assert engine.torque_map == [300, 100, 200, 400]
+    engine.torque_map.sort()
+    assert torque_map == [100, 200, 300, 400]
+    assert engine.torque_map + [500] == [100, 200, 300, 400, 500]
+    assert engine.torque_map * 2 == [100, 200, 300, 400] * 2
+    assert engine.torque_map.copy() is not torque_map
+    assert engine.scale(2).torque_map is torque_map
+    assert torque_map == [200, 400, 600, 800]
+
+    prototype = CarSetup(front_wing_angle=5, tyre_pressure_psi=20.0, engine=engine)
+    assert isinstance(prototype.clone().engine.torque_map, list)
+    clone = prototype.clone(copy_on_write=True)
+    torque_map[0] = 1
+    assert prototype.engine.torque_map == [200, 400, 600, 800]
+    assert clone.engine.torque_map == [200, 400, 600, 800]
+
+def test_variant_engine_is_read_only():
+    """
+    TEST 24: Read-Only Variant Engines
+    Writes through a variant's engine raise instead of being lost, and torque
+    spans must fit inside the map.
+    """
+    import pickle
+
+    baseline = CarSetup(front_wing_angle=5, tyre_pressure_psi=21.0,
+                        engine=EngineConfiguration(mode="Race", torque_map=[100, 200, 300]))
+    variant = baseline.derive(front_wing_angle=6)
+
+    with pytest.raises(AttributeError):
+        variant.engine.mode = "Qualifying"
+    with pytest.raises(TypeError):
+        variant.engine.torque_map[0] = 1
+    with pytest.raises(TypeError):
+        variant.engine.torque_map.append(400)
+    with pytest.raises(TypeError):
+        variant.engine.scale(1.1)
+    variant.mode = "Qualifying"
+    assert variant.engine.mode == "Qualifying"
+    assert baseline.engine.mode == "Race"
+    assert baseline.engine.torque_map == [100, 200, 300]
+
+    editable = copy.deepcopy(variant.engine)
+    editable.torque_map[0] = 1
+    assert editable.torque_map == [1, 200, 300]
+    assert pickle.loads(pickle.dumps(variant.engine)).torque_map == [100, 200, 300]
+    resolved = variant.resolve()
+    resolved.engine.mode = "Save"
+    assert resolved.engine.mode == "Save"
+
+    variant.set_torque_span(1, [210, 310])
+    for start, values in ((-1, [1]), (2, [1, 2]), (4, [])):
+        with pytest.raises(IndexError):
+            variant.set_torque_span(start, values)
+    assert variant.engine.torque_map == [100, 210, 310]
@@ -0,0 +1,123 @@
+from car_setup import CarSetup, EngineConfiguration
+from setup_index import SetupIndex
+
+def brute_force_nearest(setups, wing, pressure, mode, k, scale):
+    from math import hypot
+    candidates = [setup for setup in setups if setup.engine.mode == mode]
+    candidates.sort(key=lambda setup: hypot(setup.front_wing_angle / scale[0] - wing / scale[0],
+                                            setup.tyre_pressure_psi / scale[1] - pressure / scale[1]))
+    return candidates[:k]
+
+def test_nearest_matches_brute_force():
+    """
+    TEST 1: Nearest-Neighbour Correctness
+    The index returns the same k nearest setups as a full scan, per mode.
+    """
+    import random
+
+    rng = random.Random(7)
+    setups = [CarSetup(front_wing_angle=rng.randint(0, 40),
+                       tyre_pressure_psi=round(rng.uniform(18.0, 26.0), 2),
+                       engine=EngineConfiguration(mode=rng.choice(("Race", "Qualifying")), torque_map=[index]))
+              for index in range(2_000)]
+    index = SetupIndex(scale=(2.0, 0.5))
+    index.extend(setups[:1_000])
+    for setup in setups[1_000:]:
+        index.insert(setup)
+    assert len(index) == 2_000
+
+    for _ in range(50):
+        wing, pressure = rng.uniform(-5, 45), rng.uniform(17.0, 27.0)
+        for mode in ("Race", "Qualifying"):
+            found = index.nearest(wing, pressure, mode, k=5)
+            expected = brute_force_nearest(setups, wing, pressure, mode, 5, (2.0, 0.5))
+            assert [setup.engine.torque_map[0] for setup in found] == [setup.engine.torque_map[0] for setup in expected]
+
+def test_incremental_insert_and_clone():
+    """
+    TEST 2: Incremental Inserts
+    New setups are found right after insertion, results are ready to clone(),
+    and modes never mix.
+    """
+    index = SetupIndex()
+    index.insert(CarSetup(front_wing_angle=20, tyre_pressure_psi=21.0,
+                          engine=EngineConfiguration(mode="Race", torque_map=[1])))
+    assert index.nearest(23, 21.5, "Qualifying") == []
+
+    quali = CarSetup(front_wing_angle=24, tyre_pressure_psi=21.5,
+                     engine=EngineConfiguration(mode="Qualifying", torque_map=[2]))
+    index.insert(quali)
+    closest = index.nearest(23, 21.5, "Qualifying", k=3)
+
+    assert closest == [quali]
+    clone = closest[0].clone()
+    assert clone is not quali
+    assert clone.engine.mode == "Qualifying"
+
+def test_nearest_on_sorted_grid():
+    """
+    TEST 3: Sorted Grid
+    A grid filled in sorted order, where whole columns share a wing angle, still
+    answers k=5 queries exactly like a full scan, ties going to the earlier insert.
+    """
+    import random
+
+    rng = random.Random(11)
+    engine = EngineConfiguration(mode="Race", torque_map=[0])
+    setups = [CarSetup(front_wing_angle=wing, tyre_pressure_psi=18.0 + step * 0.02, engine=engine)
+              for wing in range(50) for step in range(400)]
+    index = SetupIndex()
+    index.extend(setups)
+    assert len(index) == 20_000
+
+    for _ in range(20):
+        wing, pressure = rng.uniform(0, 40), rng.uniform(18.0, 26.0)
+        found = index.nearest(wing, pressure, "Race", k=5)
+        expected = brute_force_nearest(setups, wing, pressure, "Race", 5, index.scale)
+        assert [id(setup) for setup in found] == [id(setup) for setup in expected]
+
+def test_inserts_never_rebuild_the_index(monkeypatch):
+    """
+    TEST 4: Bounded Insert Cost
+    Tree merges are spread over the inserts that follow them, so no single insert
+    does more than a small, fixed slice of work, even when it completes the
+    merge of the largest trees. Queries stay exact while merges are in progress.
+    """
+    import random
+    import setup_index
+
+    handled = [0]
+    original_merged = setup_index._StaticKDTree.merged
+
+    def counted_merged(first, second):
+        steps = original_merged(first, second)
+        while True:
+            try:
+                points = next(steps)
+            except StopIteration as done:
+                return done.value
+            handled[0] += points
+            yield points
+
+    monkeypatch.setattr(setup_index._StaticKDTree, "merged", staticmethod(counted_merged))
+
+    rng = random.Random(3)
+    engine = EngineConfiguration(mode="Race", torque_map=[0])
+    setups = [CarSetup(front_wing_angle=rng.randint(0, 40), tyre_pressure_psi=round(rng.uniform(18.0, 26.0), 2),
+                       engine=engine) for _ in range(20_000)]
+    index = SetupIndex()
+    worst = 0
+    for count, setup in enumerate(setups, 1):
+        before = handled[0]
+        index.insert(setup)
+        worst = max(worst, handled[0] - before)
+        if count % 2_500 == 0:
+            wing, pressure = rng.uniform(0, 40), rng.uniform(18.0, 26.0)
+            expected = brute_force_nearest(setups[:count], wing, pressure, "Race", 5, (1.0, 0.25))
+            assert index.nearest(wing, pressure, "Race", k=5) == expected
+
+    partition = index._partitions["Race"]
+    assert sum(len(tree) for trees in partition.levels for tree in trees) + len(partition.buffer) == 20_000
+    assert max(len(tree) for trees in partition.levels for tree in trees) == 16_384
+    # Merging into the largest tree handles over 200,000 points in total
+    assert worst < 2_000
@@ -0,0 +1,131 @@
+import pickle
+from array import array
+import pytest
+from car_setup import CarSetup, EngineConfiguration
+from setup_library import SetupLibrary, save_setups
+
+def make_library(count, points):
+    modes = ("Race", "Qualifying", "Save")
+    return [CarSetup(front_wing_angle=index % 30,
+                     tyre_pressure_psi=19.0 + (index % 40) * 0.1,
+                     engine=EngineConfiguration(mode=modes[index % 3],
+                                                torque_map=[index + rpm for rpm in range(points + index % 3)]))
+            for index in range(count)]
+
+def test_round_trip(tmp_path):
+    """
+    TEST 1: Round Trip
+    Every setup written to the columnar format comes back with the same values.
+    """
+    setups = make_library(50, 10)
+    path = tmp_path / "setups.f1lib"
+
+    assert save_setups(setups, path) == 50
+    with SetupLibrary(path) as library:
+        assert len(library) == 50
+        assert library.modes == ["Race", "Qualifying", "Save"]
+        for original, loaded in zip(setups, library):
+            assert loaded.front_wing_angle == original.front_wing_angle
+            assert loaded.tyre_pressure_psi == original.tyre_pressure_psi
+            assert loaded.engine.mode == original.engine.mode
+            assert loaded.engine.torque_map == list(original.engine.torque_map)
+        del loaded
+        assert library[-1].front_wing_angle == setups[-1].front_wing_angle
+        with pytest.raises(IndexError):
+            library[50]
+
+def test_torque_maps_are_zero_copy_until_written(tmp_path):
+    """
+    TEST 2: Zero-Copy Torque Maps
+    A materialized setup views its torque map inside the mapping, and writing
+    to it copies the map instead of failing on the read-only file.
+    """
+    path = tmp_path / "setups.f1lib"
+    save_setups(make_library(3, 4), path)
+    library = SetupLibrary(path)
+
+    setup = library[1]
+    assert isinstance(setup.engine.torque_map._values, memoryview)
+    setup.engine.torque_map[0] = -1
+    assert setup.engine.torque_map[0] == -1
+    assert library[1].engine.torque_map[0] == 1
+
+    clone = library[2].clone()
+    assert clone.engine.torque_map == [2, 3, 4, 5, 6, 7]
+
+    del setup
+    library.close()
+
+def test_rejects_foreign_files(tmp_path, monkeypatch):
+    """
+    TEST 3: Format Check
+    Opening a file that is not a setup library, or one written with the other
+    byte order, raises ValueError and leaves no mapping open behind it.
+    """
+    import mmap
+
+    opened = []
+    class TrackedMap(mmap.mmap):
+        def __new__(cls, *args, **kwargs):
+            opened.append(super().__new__(cls, *args, **kwargs))
+            return opened[-1]
+    monkeypatch.setattr(mmap, "mmap", TrackedMap)
+
+    foreign = tmp_path / "not_a_library.bin"
+    foreign.write_bytes(bytes(128))
+    swapped = tmp_path / "swapped.f1lib"
+    save_setups(make_library(3, 4), swapped)
+    header = bytearray(swapped.read_bytes())
+    header[8:9] = b">" if header[8:9] == b"<" else b"<"
+    swapped.write_bytes(header)
+
+    for path in (foreign, swapped):
+        with pytest.raises(ValueError):
+            SetupLibrary(path)
+    assert len(opened) == 2
+    assert all(mapping.closed for mapping in opened)
+
+def test_random_access_in_large_library(tmp_path):
+    """
+    TEST 4: Random Access
+    In a 5,000-setup library, reading the first, last or any single setup by
+    index returns exactly the values that were saved for it.
+    """
+    setups = make_library(5_000, 200)
+    path = tmp_path / "setups.f1lib"
+    save_setups(setups, path)
+
+    with SetupLibrary(path) as library:
+        assert len(library) == 5_000
+        for index in (4_321, 0, 4_999):
+            setup, original = library[index], setups[index]
+            assert setup.front_wing_angle == original.front_wing_angle
+            assert setup.tyre_pressure_psi == original.tyre_pressure_psi
+            assert setup.engine.mode == original.engine.mode
+            assert list(setup.engine.torque_map) == original.engine.torque_map
+            del setup
+
+def test_mapped_setups_pickle_and_slice_like_lists(tmp_path):
+    """
+    TEST 5: Mapped Setups Behave Like Owned Ones
+    Setups read from a library can be pickled, slice to plain lists and copy
+    their torque maps into owned compact arrays.
+    """
+    path = tmp_path / "setups.f1lib"
+    save_setups(make_library(3, 4), path)
+    library = SetupLibrary(path)
+
+    setup = library[2]
+    torque_map = setup.engine.torque_map
+    assert torque_map[1:3] == [3, 4]
+
+    restored = pickle.loads(pickle.dumps(setup))
+    assert restored.engine.torque_map == [2, 3, 4, 5, 6, 7]
+    assert restored.engine.torque_map.compact
+
+    clone = setup.clone()
+    assert type(clone.engine.torque_map._values) is array
+    assert clone.engine.torque_map == [2, 3, 4, 5, 6, 7]
+
+    del setup, torque_map
+    library.close()
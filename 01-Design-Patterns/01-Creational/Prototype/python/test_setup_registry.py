@@ -0,0 +1,131 @@
+import copy
+import threading
+import pytest
+from car_setup import CarSetup, EngineConfiguration
+from setup_registry import SetupRegistry, copier_for
+
+def make_setup(mode="Race", points=100, compact=False):
+    return CarSetup(front_wing_angle=12, tyre_pressure_psi=21.5,
+                    engine=EngineConfiguration(mode=mode, torque_map=list(range(points)), compact=compact))
+
+def test_registry_hands_out_independent_clones():
+    """
+    TEST 1: Keyed Templates
+    Templates are stored under (circuit, session, mode); every clone is a deep,
+    independent copy that never writes through to the template or the original.
+    """
+    registry = SetupRegistry()
+    original = make_setup(mode="Qualifying")
+    key = registry.register("Monza", "Q3", original)
+    assert key == ("Monza", "Q3", "Qualifying")
+
+    clone_a = registry.get_clone(key)
+    clone_b = registry.get_clone(key)
+    assert type(clone_a) is CarSetup
+    assert clone_a is not clone_b
+    assert clone_a.engine is not clone_b.engine
+    assert clone_a.engine.torque_map is not clone_b.engine.torque_map
+
+    clone_a.engine.torque_map[0] = 999
+    clone_a.front_wing_angle = 30
+    original.engine.torque_map[1] = 555
+    fresh = registry.get_clone(key)
+    assert fresh.front_wing_angle == 12
+    assert fresh.engine.torque_map[:2] == [0, 1]
+
+    compact_key = registry.register("Monza", "FP1", make_setup(compact=True))
+    assert registry.get_clone(compact_key).engine.torque_map.compact
+
+    with pytest.raises(KeyError):
+        registry.get_clone(("Monaco", "Race", "Race"))
+
+def test_registry_resolves_variants():
+    """
+    TEST 2: Pre-Warmed Variants
+    A registered SetupVariant is resolved once; clones are plain CarSetups.
+    """
+    registry = SetupRegistry()
+    variant = make_setup().derive(front_wing_angle=4, mode="Save")
+    variant.set_torque_span(0, [7, 7])
+    key = registry.register("Spa", "Race", variant)
+
+    clone = registry.get_clone(key)
+    assert key == ("Spa", "Race", "Save")
+    assert type(clone) is CarSetup
+    assert clone.front_wing_angle == 4
+    assert clone.engine.torque_map[:3] == [7, 7, 2]
+
+def test_registry_lru_bound():
+    """
+    TEST 3: LRU Bound
+    Registering beyond max_templates evicts the least recently used template;
+    both get_clone() and re-registering a key count as a use.
+    """
+    registry = SetupRegistry(max_templates=2)
+    monza = registry.register("Monza", "Race", make_setup())
+    spa = registry.register("Spa", "Race", make_setup())
+    registry.get_clone(monza)
+    registry.register("Suzuka", "Race", make_setup())
+
+    assert len(registry) == 2
+    assert monza in registry
+    assert spa not in registry
+    assert list(registry.keys()) == [monza, ("Suzuka", "Race", "Race")]
+
+    registry.register("Monza", "Race", make_setup())
+    registry.register("Spa", "Race", make_setup())
+    assert list(registry.keys()) == [monza, spa]
+
+    with pytest.raises(ValueError):
+        SetupRegistry(max_templates=0)
+
+def test_concurrent_get_clone():
+    """
+    TEST 4: Thread Safety
+    Many threads cloning and registering at once get correct, unshared clones.
+    """
+    registry = SetupRegistry(max_templates=8)
+    keys = [registry.register(f"Circuit {n}", "Race", make_setup(points=50 + n)) for n in range(4)]
+    errors = []
+
+    def worker(offset):
+        for round_ in range(500):
+            key = keys[(offset + round_) % len(keys)]
+            clone = registry.get_clone(key)
+            clone.engine.torque_map[0] = -1
+            if len(clone.engine.torque_map) != 50 + keys.index(key):
+                errors.append(key)
+            if round_ % 50 == 0:
+                registry.register(f"Extra {offset}", "Race", make_setup())
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert all(registry.get_clone(key).engine.torque_map[0] == 0 for key in keys)
+    assert len(registry) <= 8
+
+def test_specialized_copier_matches_deepcopy():
+    """
+    TEST 5: Specialized Copier
+    get_clone() uses the registered CarSetup copier rather than copy.deepcopy, and
+    its clones match a deepcopy field for field while sharing nothing mutable.
+    """
+    setup = make_setup(points=100)
+    registry = SetupRegistry()
+    key = registry.register("Monza", "Race", setup)
+    assert copier_for(CarSetup) is not copy.deepcopy
+
+    clone, reference = registry.get_clone(key), copy.deepcopy(setup)
+    assert (clone.front_wing_angle, clone.tyre_pressure_psi) == (reference.front_wing_angle, reference.tyre_pressure_psi)
+    assert clone.engine.mode == reference.engine.mode
+    assert clone.engine.torque_map == reference.engine.torque_map
+    assert clone.engine is not setup.engine
+    assert clone.engine.torque_map is not setup.engine.torque_map
+
+    clone.engine.torque_map[0] = -1
+    assert setup.engine.torque_map[0] != -1
+    assert registry.get_clone(key).engine.torque_map == setup.engine.torque_map
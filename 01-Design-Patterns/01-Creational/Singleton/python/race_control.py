@@ -1,31 +1,223 @@
+import asyncio
+import logging
 import threading
+import time
+from array import array
+from collections import deque
+from typing import AsyncIterator, Callable, Optional
+
+logger = logging.getLogger(__name__)
 
 class Singleton(type):
     _instances = {}
-    _lock = threading.Lock()  # Ensures thread-safe singleton creation
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+        cls._singleton_lock = threading.Lock()  # One creation lock per singleton class
 
     def __call__(cls, *args, **kwargs):
-        with cls._lock:
-            if cls not in cls._instances:
-                cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
-        return cls._instances[cls]
+        # Lock-free fast path once the instance exists; double-checked under the class lock
+        instance = cls._instances.get(cls)
+        if instance is None:
+            with cls._singleton_lock:
+                instance = cls._instances.get(cls)
+                if instance is None:
+                    instance = super(Singleton, cls).__call__(*args, **kwargs)
+                    cls._instances[cls] = instance
+        return instance
     
+class StatusHistory:
+    # Append-only ring buffer of (monotonic_ns, status) transitions. Columns are
+    # preallocated typed arrays, and each entry also stores the cumulative time
+    # spent in every status up to that transition, so range sums are two lookups.
+    STATUSES = ("GREEN", "YELLOW", "RED", "SAFETY_CAR")
+
+    def __init__(self, capacity: int = 4096):
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self._capacity = capacity
+        self._codes_by_status = {status: code for code, status in enumerate(self.STATUSES)}
+        self._timestamps = array("q", bytes(8 * capacity))
+        self._codes = array("B", bytes(capacity))
+        self._cumulative = array("q", bytes(8 * capacity * len(self.STATUSES)))
+        self._start = 0  # Physical slot of the oldest retained transition
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _slot(self, index: int) -> int:
+        return (self._start + index) % self._capacity
+
+    def append(self, status: str, timestamp_ns: int) -> None:
+        code = self._codes_by_status[status]
+        width = len(self.STATUSES)
+        slot = self._slot(self._count) if self._count < self._capacity else self._start
+        base = slot * width
+        if self._count:
+            last = self._slot(self._count - 1)
+            if timestamp_ns < self._timestamps[last]:
+                raise ValueError("Transitions must be appended in time order")
+            self._cumulative[base:base + width] = self._cumulative[last * width:last * width + width]
+            self._cumulative[base + self._codes[last]] += timestamp_ns - self._timestamps[last]
+        else:
+            self._cumulative[base:base + width] = array("q", bytes(8 * width))
+        self._timestamps[slot] = timestamp_ns
+        self._codes[slot] = code
+        if self._count < self._capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self._capacity
+
+    def __getitem__(self, index: int) -> tuple[int, str]:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("StatusHistory index out of range")
+        slot = self._slot(index)
+        return self._timestamps[slot], self.STATUSES[self._codes[slot]]
+
+    def _index_at(self, timestamp_ns: int) -> int:
+        # Binary search for the last transition at or before `timestamp_ns`, -1 if none
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamps[self._slot(mid)] <= timestamp_ns:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1
+
+    def status_at(self, timestamp_ns: int) -> Optional[str]:
+        index = self._index_at(timestamp_ns)
+        return self[index][1] if index >= 0 else None
+
+    def transitions(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> list[tuple[int, str]]:
+        first = 0 if start_ns is None else self._index_at(start_ns - 1) + 1
+        last = self._count - 1 if end_ns is None else self._index_at(end_ns)
+        return [self[index] for index in range(first, last + 1)]
+
+    def _time_until(self, code: int, timestamp_ns: int) -> int:
+        # Time spent in `code` from the oldest retained transition up to `timestamp_ns`
+        index = max(self._index_at(timestamp_ns), 0)
+        slot = self._slot(index)
+        spent = self._cumulative[slot * len(self.STATUSES) + code]
+        if self._codes[slot] == code and timestamp_ns > self._timestamps[slot]:
+            spent += timestamp_ns - self._timestamps[slot]
+        return spent
+
+    def time_in_status(self, status: str, start_ns: int, end_ns: int) -> int:
+        if not self._count or end_ns <= start_ns:
+            return 0
+        code = self._codes_by_status[status]
+        return self._time_until(code, end_ns) - self._time_until(code, start_ns)
+
+    def total_time_in_status(self, status: str, now_ns: Optional[int] = None) -> int:
+        # O(1): cumulative total at the newest transition plus its open interval
+        if not self._count:
+            return 0
+        code = self._codes_by_status[status]
+        width = len(self.STATUSES)
+        oldest, newest = self._start, self._slot(self._count - 1)
+        spent = self._cumulative[newest * width + code] - self._cumulative[oldest * width + code]
+        if self._codes[newest] == code:
+            spent += max((time.monotonic_ns() if now_ns is None else now_ns) - self._timestamps[newest], 0)
+        return spent
+
 class RaceControl(metaclass=Singleton):
     def __init__(self):
-        self._race_status: str = "GREEN"
-        self._lock = threading.Lock()
+        # (status, generation) is swapped as one reference, so readers never need the lock
+        self._state: tuple[str, int] = ("GREEN", 0)
+        self._lock = threading.Lock()  # Serializes writers only
+        self._changed = threading.Condition(self._lock)
+        self._subscribers: tuple[Callable[[str], None], ...] = ()
+        # Notifications queue up in generation order and are delivered by one
+        # thread at a time, so no subscriber sees an older flag after a newer one
+        self._pending: deque[tuple[str, tuple]] = deque()
+        self._delivery_lock = threading.Lock()
+        self._delivering: Optional[int] = None  # Thread currently draining _pending
+        self._history = StatusHistory()
+        self._history.append("GREEN", time.monotonic_ns())
 
     @staticmethod
     def get_instance():
-        return RaceControl()
+        # Skips the metaclass call entirely once the instance exists
+        return Singleton._instances.get(RaceControl) or RaceControl()
 
     def get_status(self) -> str:
-        with self._lock:
-            return self._race_status
+        return self._state[0]
+
+    def get_generation(self) -> int:
+        return self._state[1]
+
+    def get_snapshot(self) -> tuple[str, int]:
+        # Status and the generation it was written in, read as one consistent pair
+        return self._state
     
     def update_status(self, status: str) -> None:
         allowed_status = ["GREEN", "YELLOW", "RED", "SAFETY_CAR"]
         if status not in allowed_status:
             raise ValueError(f"Status must be one of {allowed_status}")
+        with self._changed:
+            current, generation = self._state
+            if status == current:
+                return
+            self._state = (status, generation + 1)
+            self._history.append(status, time.monotonic_ns())
+            self._changed.notify_all()
+            self._pending.append((status, self._subscribers))
+        self._deliver()
+
+    def _deliver(self) -> None:
+        # Callbacks run outside the write lock so they may read or update the status
+        # themselves. An update made from inside a callback is only queued; the loop
+        # below delivers it once every subscriber has seen the current flag.
+        if self._delivering == threading.get_ident():
+            return
+        with self._delivery_lock:
+            self._delivering = threading.get_ident()
+            try:
+                while self._pending:
+                    status, subscribers = self._pending.popleft()
+                    for callback in subscribers:
+                        try:
+                            callback(status)
+                        except Exception:
+                            # One failing subscriber must not starve the rest or the writer
+                            logger.exception("RaceControl subscriber %r failed on %s", callback, status)
+            finally:
+                self._delivering = None
+
+    def get_history(self) -> StatusHistory:
+        # Appended under the write lock; queries are meant for analysis, not the hot path
+        return self._history
+
+    def subscribe(self, callback: Callable[[str], None]) -> Callable[[], None]:
+        # Returns a function that removes the subscription again
         with self._lock:
-            self._race_status = status
\ No newline at end of file
+            self._subscribers = self._subscribers + (callback,)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                remaining = list(self._subscribers)
+                if callback in remaining:
+                    remaining.remove(callback)
+                self._subscribers = tuple(remaining)
+        return unsubscribe
+
+    def wait_for_change(self, since_generation: int, timeout: Optional[float] = None) -> tuple[str, int]:
+        # Blocks until the generation moves past `since_generation` or the timeout expires
+        with self._changed:
+            self._changed.wait_for(lambda: self._state[1] != since_generation, timeout)
+            return self._state
+
+    async def stream(self) -> AsyncIterator[str]:
+        # Yields every new status; updates may come from any thread
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[str] = asyncio.Queue()
+        unsubscribe = self.subscribe(lambda status: loop.call_soon_threadsafe(queue.put_nowait, status))
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            unsubscribe()
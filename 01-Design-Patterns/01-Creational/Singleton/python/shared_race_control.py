@@ -0,0 +1,168 @@
+import fcntl
+import os
+import tempfile
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+from race_control import StatusHistory
+
+# Segment layout, four native uint64 words:
+#   sequence (odd while a write is in progress) | status code | generation | magic
+_WORDS = 4
+_SEQUENCE, _CODE, _GENERATION, _MAGIC = range(_WORDS)
+MAGIC = 0x4631_5241_4345_4354  # "F1RACECT"
+# Failed read attempts before a reader starts yielding and checks for a dead writer
+_SPINS = 1_000
+
+class _ProcessLock:
+    # Writer lock that holds across threads (threading.Lock) and across processes
+    # (flock on a lock file named after the segment). POSIX only. flock locks an
+    # open file description, which a forked child shares with its parent, so every
+    # process opens the lock file itself before its first acquire.
+    def __init__(self, path: str):
+        self._path = path
+        self._open()
+
+    def _open(self) -> None:
+        self._pid = os.getpid()
+        self._thread_lock = threading.Lock()
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def __enter__(self) -> "_ProcessLock":
+        if self._pid != os.getpid():
+            os.close(self._fd)
+            self._open()
+        self._thread_lock.acquire()
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+class SharedRaceControl:
+    # RaceControl backend whose state lives in a shared memory segment, so every
+    # process that attaches to it sees one status. Readers never lock: they read
+    # the words straight out of the segment and retry if the sequence word was odd
+    # or moved meanwhile (a seqlock). Writers are serialized across processes.
+    # A writer killed mid-write (e.g. SIGKILL) leaves the sequence word odd; the
+    # kernel drops its flock, so the next writer or a reader that keeps failing
+    # takes the lock, sees the odd word and closes the write out in recover().
+    STATUSES = StatusHistory.STATUSES
+
+    def __init__(self, segment: shared_memory.SharedMemory, owner: bool):
+        self._segment = segment
+        self._owner = owner
+        self._words = segment.buf[:8 * _WORDS].cast("Q")
+        self._lock = _ProcessLock(self._lock_path(segment.name))
+        self._codes_by_status = {status: code for code, status in enumerate(self.STATUSES)}
+
+    @staticmethod
+    def _lock_path(name: str) -> str:
+        return os.path.join(tempfile.gettempdir(), f"{name.lstrip('/')}.lock")
+
+    @classmethod
+    def create(cls, name: Optional[str] = None) -> "SharedRaceControl":
+        # New segment starting at GREEN, generation 0; the creator unlinks it
+        segment = shared_memory.SharedMemory(name=name, create=True, size=8 * _WORDS)
+        segment.buf[:8 * _WORDS] = bytes(8 * _WORDS)
+        control = cls(segment, owner=True)
+        control._words[_MAGIC] = MAGIC
+        return control
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedRaceControl":
+        segment = shared_memory.SharedMemory(name=name)
+        if segment.size < 8 * _WORDS or segment.buf[:8 * _WORDS].cast("Q")[_MAGIC] != MAGIC:
+            segment.close()
+            raise ValueError(f"{name} is not a RaceControl segment")
+        return cls(segment, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._segment.name
+
+    def __reduce__(self):
+        # Passed to another process, it attaches to the same segment by name
+        return SharedRaceControl.attach, (self.name,)
+
+    def get_snapshot(self) -> tuple[str, int]:
+        words = self._words
+        spins = 0
+        while True:
+            sequence = words[_SEQUENCE]
+            if not sequence & 1:
+                code, generation = words[_CODE], words[_GENERATION]
+                if words[_SEQUENCE] == sequence:
+                    return self.STATUSES[code], generation
+            spins += 1
+            if spins >= _SPINS:
+                if spins % _SPINS == 0:
+                    self.recover()
+                time.sleep(0)
+
+    def get_status(self) -> str:
+        return self.get_snapshot()[0]
+
+    def get_generation(self) -> int:
+        return self.get_snapshot()[1]
+
+    def update_status(self, status: str) -> None:
+        allowed_status = list(self.STATUSES)
+        if status not in allowed_status:
+            raise ValueError(f"Status must be one of {allowed_status}")
+        code = self._codes_by_status[status]
+        words = self._words
+        with self._lock:
+            self._close_torn_write()
+            if words[_CODE] == code:
+                return
+            words[_SEQUENCE] += 1
+            try:
+                words[_CODE] = code
+                words[_GENERATION] += 1
+            finally:
+                words[_SEQUENCE] += 1
+
+    def recover(self) -> bool:
+        # Returns True if a write left unfinished by a dead writer was closed out.
+        # A live writer holds the lock for its whole write, so this never
+        # interrupts one; it only waits for it.
+        with self._lock:
+            return self._close_torn_write()
+
+    def _close_torn_write(self) -> bool:
+        # Caller holds the lock. The dead writer may have stored the new code
+        # without bumping the generation, so bump it to make pollers re-read.
+        words = self._words
+        if not words[_SEQUENCE] & 1:
+            return False
+        words[_GENERATION] += 1
+        words[_SEQUENCE] += 1
+        return True
+
+    def close(self) -> None:
+        self._words.release()
+        self._lock.close()
+        self._segment.close()
+        if self._owner:
+            self._segment.unlink()
+            try:
+                os.unlink(self._lock_path(self.name))
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> "SharedRaceControl":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,6 +1,6 @@
 import pytest
 import threading
-from race_control import RaceControl
+from race_control import RaceControl, Singleton, StatusHistory
 
 def test_singleton_identity():
     """
@@ -90,4 +90,313 @@ def test_invalid_status_raises_error():
         instance.update_status("PURPLE") # This color does not exist in F1
     
     # Verify the error message contains the expected guidance
-    assert "Status must be one of" in str(excinfo.value)
\ No newline at end of file
+    assert "Status must be one of" in str(excinfo.value)
+
+def test_generation_tracks_changes():
+    """
+    TEST 7: Verification of the Generation Counter
+    Readers must be able to tell whether the status changed since their last poll.
+    """
+    instance = RaceControl.get_instance()
+    instance.update_status("GREEN")
+    status, generation = instance.get_snapshot()
+
+    instance.update_status("GREEN")  # Same flag again is not a change
+    assert instance.get_generation() == generation
+
+    instance.update_status("SAFETY_CAR")
+    assert instance.get_snapshot() == ("SAFETY_CAR", generation + 1)
+
+    instance.update_status("GREEN")
+    assert instance.get_generation() == generation + 2
+
+def test_reads_under_contention():
+    """
+    TEST 8: Verification of Reads Under Contention (N Readers, 1 Writer)
+    Readers poll without taking the lock while a writer keeps flipping the flag;
+    every reader makes progress and never sees the generation go backwards.
+    """
+    import time
+
+    instance = RaceControl.get_instance()
+    duration = 0.05
+
+    for readers in (1, 2, 4, 8):
+        stop = threading.Event()
+        counts = [0] * readers
+        regressions = []
+
+        def reader(slot):
+            last_generation = 0
+            reads = 0
+            while not stop.is_set():
+                status, generation = instance.get_snapshot()
+                if generation < last_generation:
+                    regressions.append((last_generation, generation))
+                last_generation = generation
+                reads += 1
+            counts[slot] = reads
+
+        def writer():
+            flags = ("YELLOW", "GREEN")
+            flips = 0
+            while not stop.is_set():
+                instance.update_status(flags[flips % 2])
+                flips += 1
+
+        threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(readers)]
+        threads.append(threading.Thread(target=writer))
+        for t in threads:
+            t.start()
+        time.sleep(duration)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        assert not regressions, "A reader observed the generation going backwards!"
+        assert all(counts)
+
+    instance.update_status("GREEN")
+
+def test_per_class_creation_locks():
+    """
+    TEST 9: Verification of Per-Class Locks
+    Creating one singleton class must not block lookups of another.
+    """
+    class SlowToBuild(metaclass=Singleton):
+        def __init__(self):
+            started.set()
+            release.wait(timeout=5)
+
+    started, release = threading.Event(), threading.Event()
+    builder = threading.Thread(target=SlowToBuild)
+    builder.start()
+    try:
+        started.wait(timeout=5)
+
+        assert SlowToBuild._singleton_lock is not RaceControl._singleton_lock
+        assert SlowToBuild._singleton_lock.locked()
+        assert RaceControl.get_instance() is RaceControl()  # Not blocked by the other class
+
+        release.set()
+        builder.join()
+        assert SlowToBuild() is SlowToBuild()
+    finally:
+        release.set()
+        builder.join()
+        Singleton._instances.pop(SlowToBuild, None)
+
+def test_get_instance_skips_the_lock():
+    """
+    TEST 10: Verification of the Lock-Free Lookup
+    Once the instance exists, get_instance() and RaceControl() return it even
+    while another thread holds the creation lock.
+    """
+    instance = RaceControl.get_instance()
+    results = []
+    lookup = threading.Thread(target=lambda: results.extend((RaceControl.get_instance(), RaceControl())))
+
+    with RaceControl._singleton_lock:
+        lookup.start()
+        lookup.join(timeout=5)
+    assert results == [instance, instance]
+
+def test_subscribers_are_notified():
+    """
+    TEST 11: Verification of Push Notifications
+    Subscribed callbacks receive every flag change until they unsubscribe.
+    """
+    instance = RaceControl.get_instance()
+    instance.update_status("GREEN")
+    received = []
+
+    unsubscribe = instance.subscribe(received.append)
+    instance.update_status("SAFETY_CAR")
+    instance.update_status("SAFETY_CAR")  # No change, no notification
+    instance.update_status("GREEN")
+    unsubscribe()
+    instance.update_status("RED")
+    instance.update_status("GREEN")
+
+    assert received == ["SAFETY_CAR", "GREEN"]
+
+def test_wait_for_change_wakes_waiter():
+    """
+    TEST 12: Verification of Blocking Waiters
+    A waiting thread is woken by update_status without polling, and a
+    waiter with nothing to wake it returns after its timeout.
+    """
+    instance = RaceControl.get_instance()
+    instance.update_status("GREEN")
+    _, generation = instance.get_snapshot()
+
+    assert instance.wait_for_change(generation, timeout=0.01) == ("GREEN", generation)
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(instance.wait_for_change(generation, timeout=5)))
+    waiter.start()
+    instance.update_status("YELLOW")
+    waiter.join()
+
+    assert results == [("YELLOW", generation + 1)]
+    instance.update_status("GREEN")
+
+def test_async_stream():
+    """
+    TEST 13: Verification of the Async Stream
+    `async for status in rc.stream()` yields flag changes made from other threads.
+    """
+    import asyncio
+
+    instance = RaceControl.get_instance()
+    instance.update_status("GREEN")
+
+    async def follow_flags():
+        seen = []
+        stream = instance.stream()
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)  # Let the stream subscribe
+        threading.Thread(target=lambda: [instance.update_status(flag) for flag in ("YELLOW", "RED")]).start()
+        seen.append(await asyncio.wait_for(pending, timeout=5))
+        seen.append(await asyncio.wait_for(stream.__anext__(), timeout=5))
+        await stream.aclose()
+        return seen
+
+    assert asyncio.run(follow_flags()) == ["YELLOW", "RED"]
+    assert instance._subscribers == ()
+    instance.update_status("GREEN")
+
+def test_fan_out_to_many_subscribers():
+    """
+    TEST 14: Verification of Fan-Out (1k Subscribers)
+    Every one of 1,000 subscribers sees every flag change, in order, before
+    update_status() returns.
+    """
+    instance = RaceControl.get_instance()
+    instance.update_status("GREEN")
+    seen = [[] for _ in range(1_000)]
+    unsubscribers = [instance.subscribe(received.append) for received in seen]
+
+    flags = ("SAFETY_CAR", "GREEN") * 5
+    for flag in flags:
+        instance.update_status(flag)
+        assert all(received[-1] == flag for received in seen)
+
+    for unsubscribe in unsubscribers:
+        unsubscribe()
+
+    assert instance._subscribers == ()
+    assert all(received == list(flags) for received in seen)
+
+def test_status_history_range_queries():
+    """
+    TEST 15: Verification of the Status History
+    Transitions are kept in order and time-range sums match the timeline.
+    """
+    history = StatusHistory()
+    for timestamp, status in ((0, "GREEN"), (100, "SAFETY_CAR"), (250, "GREEN"), (400, "SAFETY_CAR"), (450, "GREEN")):
+        history.append(status, timestamp)
+
+    assert len(history) == 5
+    assert history.status_at(-1) is None
+    assert history.status_at(120) == "SAFETY_CAR"
+    assert history.transitions(100, 400) == [(100, "SAFETY_CAR"), (250, "GREEN"), (400, "SAFETY_CAR")]
+
+    assert history.time_in_status("SAFETY_CAR", 0, 500) == 200
+    assert history.time_in_status("SAFETY_CAR", 200, 420) == 70
+    assert history.time_in_status("GREEN", 0, 500) == 300
+    assert history.total_time_in_status("SAFETY_CAR", now_ns=1_000) == 200
+    assert history.total_time_in_status("GREEN", now_ns=1_000) == 100 + 150 + 550
+
+    with pytest.raises(ValueError):
+        history.append("GREEN", 10)
+
+def test_status_history_is_bounded():
+    """
+    TEST 16: Verification of the Ring Buffer
+    Once full, the oldest transitions are overwritten and queries stay correct.
+    """
+    history = StatusHistory(capacity=3)
+    for timestamp, status in enumerate(("GREEN", "YELLOW", "GREEN", "RED", "GREEN")):
+        history.append(status, timestamp * 10)
+
+    assert len(history) == 3
+    assert history.transitions() == [(20, "GREEN"), (30, "RED"), (40, "GREEN")]
+    assert history.time_in_status("GREEN", 0, 50) == 20
+    assert history.total_time_in_status("RED", now_ns=100) == 10
+
+def test_race_control_records_history():
+    """
+    TEST 17: Verification of History Recording
+    Every flag change made through RaceControl lands in its history.
+    """
+    instance = RaceControl.get_instance()
+    instance.update_status("GREEN")
+    history = instance.get_history()
+    recorded = len(history)
+
+    instance.update_status("RED")
+    instance.update_status("RED")
+    instance.update_status("GREEN")
+
+    assert len(history) == min(recorded + 2, 4096)
+    assert [status for _, status in history.transitions()[-2:]] == ["RED", "GREEN"]
+
+def test_failing_subscriber_is_isolated(caplog):
+    """
+    TEST 18: Verification of Subscriber Isolation
+    A subscriber that raises is logged; the writer does not see the exception and
+    the remaining subscribers are still notified.
+    """
+    instance = RaceControl.get_instance()
+    instance.update_status("GREEN")
+    received = []
+
+    def broken(status):
+        raise RuntimeError("telemetry link down")
+
+    unsubscribers = [instance.subscribe(broken), instance.subscribe(received.append)]
+    try:
+        instance.update_status("RED")
+    finally:
+        for unsubscribe in unsubscribers:
+            unsubscribe()
+
+    assert instance.get_status() == "RED"
+    assert received == ["RED"]
+    assert "telemetry link down" in caplog.text
+
+def test_notifications_arrive_in_order():
+    """
+    TEST 19: Verification of Notification Order
+    With concurrent writers, and with a callback that updates the flag itself,
+    subscribers see the changes in generation order and end on the current flag.
+    """
+    instance = RaceControl.get_instance()
+    instance.update_status("GREEN")
+    received = []
+
+    def escalate(status):
+        if status == "RED":
+            instance.update_status("SAFETY_CAR")
+
+    unsubscribers = [instance.subscribe(escalate), instance.subscribe(received.append)]
+    instance.update_status("RED")
+    assert received == ["RED", "SAFETY_CAR"]
+
+    def writer(flags):
+        for _ in range(200):
+            for flag in flags:
+                instance.update_status(flag)
+
+    threads = [threading.Thread(target=writer, args=(flags,))
+               for flags in (("GREEN", "YELLOW"), ("SAFETY_CAR", "GREEN"), ("YELLOW", "SAFETY_CAR"))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for unsubscribe in unsubscribers:
+        unsubscribe()
+
+    assert received[-1] == instance.get_status()
+    assert all(previous != current for previous, current in zip(received, received[1:]))
@@ -0,0 +1,148 @@
+import multiprocessing
+import os
+import pickle
+from multiprocessing.managers import BaseManager
+
+import pytest
+from race_control import RaceControl
+from shared_race_control import SharedRaceControl
+
+def _set_status(control: SharedRaceControl, status: str) -> None:
+    control.update_status(status)
+
+def _toggle(control: SharedRaceControl, rounds: int) -> None:
+    # Every update is a change, so odd generations are always YELLOW
+    for _ in range(rounds):
+        control.update_status("YELLOW")
+        control.update_status("GREEN")
+
+def _die_mid_write(control: SharedRaceControl) -> None:
+    # Holds the writer lock, starts a write and exits without finishing it
+    with control._lock:
+        control._words[0] += 1
+        control._words[1] = SharedRaceControl.STATUSES.index("RED")
+        os._exit(1)
+
+def _read_consistency(control: SharedRaceControl, stop, errors) -> None:
+    while not stop.is_set():
+        status, generation = control.get_snapshot()
+        if status != ("YELLOW" if generation % 2 else "GREEN"):
+            errors.put((status, generation))
+    errors.put(None)
+
+def _read_status(control, results) -> None:
+    results.put(control.get_snapshot())
+
+class RaceControlManager(BaseManager):
+    pass
+
+RaceControlManager.register("RaceControl", RaceControl)
+
+def test_status_is_shared_across_processes():
+    """
+    TEST 1: Verification of Cross-Process State
+    A write in a child process is visible to the parent, with the same default,
+    generation counting and validation as RaceControl.
+    """
+    with SharedRaceControl.create() as control:
+        assert control.get_snapshot() == ("GREEN", 0)
+
+        child = multiprocessing.Process(target=_set_status, args=(control, "SAFETY_CAR"))
+        child.start()
+        child.join()
+
+        assert child.exitcode == 0
+        assert control.get_snapshot() == ("SAFETY_CAR", 1)
+        control.update_status("SAFETY_CAR")
+        assert control.get_generation() == 1
+
+        with pytest.raises(ValueError):
+            control.update_status("CHEQUERED")
+
+        attached = pickle.loads(pickle.dumps(control))
+        assert attached.get_status() == "SAFETY_CAR"
+        attached.close()
+
+def test_readers_never_see_torn_snapshots():
+    """
+    TEST 2: Verification of the Seqlock
+    While another process flips the flag thousands of times, a reader process
+    always sees a status that matches its generation.
+    """
+    with SharedRaceControl.create() as control:
+        stop, errors = multiprocessing.Event(), multiprocessing.Queue()
+        reader = multiprocessing.Process(target=_read_consistency, args=(control, stop, errors))
+        reader.start()
+        writer = multiprocessing.Process(target=_toggle, args=(control, 2_000))
+        writer.start()
+        writer.join()
+        stop.set()
+
+        assert errors.get(timeout=10) is None
+        reader.join()
+        assert control.get_snapshot() == ("GREEN", 4_000)
+
+def test_attach_rejects_foreign_segments():
+    """
+    TEST 3: Verification of Segment Validation
+    Attaching to a shared memory segment that was not created by SharedRaceControl fails.
+    """
+    from multiprocessing import shared_memory
+
+    foreign = shared_memory.SharedMemory(create=True, size=64)
+    try:
+        with pytest.raises(ValueError):
+            SharedRaceControl.attach(foreign.name)
+    finally:
+        foreign.close()
+        foreign.unlink()
+
+def test_reads_match_manager_proxy():
+    """
+    TEST 4: Verification Against a Manager Proxy
+    A child process reading the shared segment sees the flag and generation the
+    parent just wrote, exactly like one reading a Manager proxy of RaceControl.
+    """
+    results = multiprocessing.Queue()
+    with SharedRaceControl.create() as control:
+        control.update_status("YELLOW")
+        reader = multiprocessing.Process(target=_read_status, args=(control, results))
+        reader.start()
+        assert results.get(timeout=30) == control.get_snapshot() == ("YELLOW", 1)
+        reader.join()
+        assert reader.exitcode == 0
+
+    with RaceControlManager() as manager:
+        proxy = manager.RaceControl()
+        proxy.update_status("YELLOW")
+        reader = multiprocessing.Process(target=_read_status, args=(proxy, results))
+        reader.start()
+        assert results.get(timeout=30) == proxy.get_snapshot()
+        reader.join()
+        assert reader.exitcode == 0
+
+def test_recovers_from_writer_killed_mid_write():
+    """
+    TEST 5: Verification of Writer Crash Recovery
+    A writer process that dies inside a write leaves the sequence word odd.
+    Readers neither spin forever nor fail: after their bounded retries they take
+    the released writer lock, close the write out and read the new status.
+    """
+    with SharedRaceControl.create() as control:
+        assert control.recover() is False
+
+        child = multiprocessing.Process(target=_die_mid_write, args=(control,))
+        child.start()
+        child.join()
+        assert child.exitcode == 1
+        assert control._words[0] % 2 == 1
+
+        assert control.get_snapshot() == ("RED", 1)
+        assert control._words[0] % 2 == 0
+        assert control.recover() is False
+
+        child = multiprocessing.Process(target=_die_mid_write, args=(control,))
+        child.start()
+        child.join()
+        control.update_status("YELLOW")
+        assert control.get_snapshot() == ("YELLOW", 3)